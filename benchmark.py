@@ -0,0 +1,490 @@
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+# Runs the full run_agent pipeline against local LinkedIn fixtures and a stub
+# Ollama server, and reports candidates/min, per-stage latency and peak RSS.
+#
+#   python benchmark.py --candidates 25 --llm-latency 2.0
+#
+# Every run starts from an empty working directory (no caches, no profile
+# store) and uses fixed seeds, so results can be compared from run to run.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+RESULTS_PER_PAGE = 10
+EMBEDDING_DIMENSIONS = 64
+
+def load_template(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+def build_candidates(count: int) -> list:
+    """
+    Cycles through the recorded personas to build `count` distinct candidates.
+    The number in each name and about text makes every profile's content
+    unique, so copies of a persona are not answered from the insights cache.
+    """
+    with open(os.path.join(FIXTURES_DIR, "candidates.json"), encoding="utf-8") as f:
+        personas = json.load(f)
+    candidates = []
+    for i in range(count):
+        persona = dict(personas[i % len(personas)])
+        persona["member_id"] = 100000 + i
+        persona["slug"] = re.sub(r"[^a-z]+", "-", persona["name"].lower()) + f"-{i}"
+        persona["name"] = f"{persona['name']} {i + 1}"
+        persona["about"] = f"{persona['about']} (Benchmark candidate {i + 1}.)"
+        candidates.append(persona)
+    return candidates
+
+# --- LinkedIn Fixture Server ---
+
+class LinkedInFixtureHandler(BaseHTTPRequestHandler):
+    """Serves the feed, search-result pages and their API payloads, profiles and skills pages from bench_fixtures."""
+
+    candidates = []
+    base_url = ""
+    templates = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: str, content_type: str = "text/html; charset=utf-8", status: int = 200):
+        encoded = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _cards(self, page_number: int):
+        start = (page_number - 1) * RESULTS_PER_PAGE
+        chunk = self.candidates[start:start + RESULTS_PER_PAGE]
+        cards = "".join(
+            self.templates["card"].substitute(
+                member_id=c["member_id"], slug=c["slug"], base_url=self.base_url,
+                name=html.escape(c["name"]), headline=html.escape(c["headline"]), location=html.escape(c["location"]),
+            )
+            for c in chunk
+        )
+        return cards, start + RESULTS_PER_PAGE < len(self.candidates)
+
+    def _search_payload(self, start: int):
+        """A search API response in the shape of the recorded voyager payload, for the results from `start` on."""
+        chunk = self.candidates[start:start + RESULTS_PER_PAGE]
+        # JSON string values are escaped without their quotes; the templates' "$type" keys are left as they are
+        escape = lambda value: json.dumps(value)[1:-1]
+        entities = ",\n".join(
+            self.templates["search_entity"].safe_substitute(
+                member_id=c["member_id"], slug=escape(c["slug"]), base_url=escape(self.base_url),
+                name=escape(c["name"]), headline=escape(c["headline"]), location=escape(c["location"]),
+            )
+            for c in chunk
+        )
+        items = [{
+            "$type": "com.linkedin.voyager.dash.search.SearchItem",
+            "item": {"*entityResult": f"urn:li:fsd_entityResultViewModel:(urn:li:fsd_profile:ACoAAB{c['member_id']},SEARCH_SRP,DEFAULT)"},
+        } for c in chunk]
+        return self.templates["search_payload"].safe_substitute(
+            start=start, count=RESULTS_PER_PAGE, total=len(self.candidates), items=json.dumps(items), entities=entities,
+        )
+
+    def _profile(self, slug: str, skills_page: bool):
+        candidate = next((c for c in self.candidates if c["slug"] == slug), None)
+        if candidate is None:
+            return self._send("<html><body><main><h1>Page not found</h1></main></body></html>", status=404)
+        if skills_page:
+            skills = "".join(self.templates["skill"].substitute(skill=html.escape(s)) for s in candidate["skills"])
+            return self._send(self.templates["skills"].substitute(name=html.escape(candidate["name"]), skills=skills))
+        experience = "".join(
+            self.templates["experience"].substitute({k: html.escape(v) for k, v in item.items()})
+            for item in candidate["experience"]
+        )
+        # The main page shows the first two skills, like LinkedIn's skills card
+        top_skills = "".join(f"<li>{self.templates['skill'].substitute(skill=html.escape(s))}</li>" for s in candidate["skills"][:2])
+        self._send(self.templates["profile"].substitute(
+            name=html.escape(candidate["name"]), headline=html.escape(candidate["headline"]),
+            location=html.escape(candidate["location"]), about=html.escape(candidate["about"]),
+            experience=experience, top_skills=top_skills,
+            profile_url=f"{self.base_url}/in/{slug}",
+        ))
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        path = parsed.path
+
+        if path.startswith("/feed"):
+            return self._send(self.templates["feed"].template)
+        if path == "/voyager/api/graphql" and "searchDashClusters" in query.get("queryId", [""])[0]:
+            start = re.search(r"start:(\d+)", query.get("variables", [""])[0])
+            return self._send(self._search_payload(int(start.group(1)) if start else 0),
+                              "application/vnd.linkedin.normalized+json+2.1; charset=utf-8")
+        if path == "/search/results/people/fragment":
+            cards, has_next = self._cards(int(query.get("page", ["1"])[0]))
+            return self._send(json.dumps({"cards": cards, "has_next": has_next}), "application/json")
+        if path.startswith("/search/results/people"):
+            page_number = int(query.get("page", ["1"])[0])
+            cards, has_next = self._cards(page_number)
+            return self._send(self.templates["search"].substitute(
+                cards=cards, page_number=page_number, total_results=len(self.candidates), results_per_page=RESULTS_PER_PAGE,
+                next_disabled="" if has_next else "disabled",
+            ))
+        match = re.match(r"^/in/([^/]+)/?(details/skills/?)?$", path)
+        if match:
+            return self._profile(match.group(1), skills_page=bool(match.group(2)))
+        self._send("<html><body>Not found</body></html>", status=404)
+
+# --- Stub Ollama Server ---
+
+def _stable_int(text: str, modulo: int) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16) % modulo
+
+def _fake_embedding(text: str) -> list:
+    """A deterministic bag-of-words hashing embedding, so similar texts get similar vectors."""
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for word in re.findall(r"[a-z0-9+#]+", text.lower()):
+        vector[_stable_int(word, EMBEDDING_DIMENSIONS)] += 1.0
+    return vector
+
+def _fake_insights(text: str) -> dict:
+    seed = _stable_int(text, 10 ** 6)
+    return {
+        "relevance_score": 1 + seed % 10,
+        "tenure_score": 1 + (seed // 10) % 10,
+        "activity_score": 1 + (seed // 100) % 10,
+        "personalised_sentence": "Your satellite communication work in C++ stood out for our team.",
+    }
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    """
+    Answers /api/tags, /api/chat and /api/embed like a local Ollama server.
+
+    Each chat takes latency seconds plus prompt_ms_per_1k_tokens per 1000 prompt
+    tokens (estimated at 4 characters per token). A system message identical to
+    the previous request's is not counted again, like Ollama's prompt cache. The
+    slots semaphore limits how many chats run at once, like OLLAMA_NUM_PARALLEL
+    on a real server. A failing server passes health checks but answers every
+    chat with an error.
+    """
+
+    latency = 1.0
+    prompt_ms_per_1k_tokens = 0.0
+    slots = threading.Semaphore(1)
+    models = ("llama3.2:latest", "nomic-embed-text:latest")
+    chat_requests = 0
+    prompt_tokens = 0
+    last_system = None
+    failing = False
+    counter_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200):
+        encoded = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            return self._send_json({"models": [
+                {"name": name, "model": name, "modified_at": "2025-01-01T00:00:00Z", "size": 1, "digest": "0" * 64}
+                for name in self.models
+            ]})
+        self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.startswith("/api/embed"):
+            inputs = request.get("input", "")
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            return self._send_json({"model": request.get("model"), "embeddings": [_fake_embedding(t) for t in inputs]})
+        if self.path.startswith("/api/chat"):
+            return self._chat(request)
+        self._send_json({"error": "not found"}, 404)
+
+    def _chat(self, request: dict):
+        with self.counter_lock:
+            type(self).chat_requests += 1
+        if self.failing:
+            return self._send_json({"error": "stub server is failing"}, 500)
+        messages = request.get("messages", [])
+        prompt = "".join(message.get("content", "") for message in messages)
+        prompt_tokens = max(1, len(prompt) // 4)
+        # Like Ollama's prompt cache, a system message identical to the previous request's is not evaluated again
+        system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else None
+        with self.counter_lock:
+            if system is not None and system == type(self).last_system:
+                prompt_tokens = max(1, prompt_tokens - len(system) // 4)
+            type(self).last_system = system
+            type(self).prompt_tokens += prompt_tokens
+        # Batch prompts list their candidates as "Candidate ID: c1", "Candidate ID: c2", ...
+        candidate_ids = re.findall(r"^\s*Candidate ID: (\S+)$", prompt, re.M)
+        if '"must_haves"' in prompt:
+            content = json.dumps({
+                "must_haves": ["C++", "Docker and Kubernetes", "TCP/IP, DVB or 3GPP", "Scrum"],
+                "nice_to_haves": ["Master's degree"],
+                "seniority": "experienced",
+                "location": "Norway",
+            })
+        elif candidate_ids:
+            content = json.dumps({"results": [
+                {"id": candidate_id, **_fake_insights(f"{candidate_id}{prompt}")} for candidate_id in candidate_ids
+            ]})
+        else:
+            insights = _fake_insights(prompt)
+            # A schema-constrained answer only has the fields the schema asks for (e.g. a repair request)
+            schema = request.get("format")
+            if isinstance(schema, dict) and schema.get("properties"):
+                insights = {field: value for field, value in insights.items() if field in schema["properties"]}
+            content = json.dumps(insights)
+        # Generation stops at num_predict tokens, even in the middle of the JSON object
+        num_predict = (request.get("options") or {}).get("num_predict")
+        if num_predict and num_predict > 0:
+            content = content[:num_predict * 4]
+        eval_count = max(1, len(content) // 4)
+
+        started = time.perf_counter()
+        with self.slots:
+            time.sleep(self.latency + prompt_tokens / 1000 * self.prompt_ms_per_1k_tokens / 1000)
+        elapsed_ns = int((time.perf_counter() - started) * 1e9)
+        stats = {
+            "total_duration": elapsed_ns,
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": elapsed_ns // 2,
+            "eval_count": eval_count,
+            "eval_duration": elapsed_ns // 2,
+        }
+        message = {"role": "assistant", "content": content}
+        base = {"model": request.get("model"), "created_at": "2025-01-01T00:00:00Z"}
+
+        if not request.get("stream", True):
+            return self._send_json({**base, "message": message, "done": True, "done_reason": "stop", **stats})
+
+        # Streamed replies are sent as newline-delimited JSON, a few characters per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for i in range(0, len(content), 8):
+                chunk = {**base, "message": {"role": "assistant", "content": content[i:i + 8]}, "done": False}
+                self.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            final = {**base, "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop", **stats}
+            self.wfile.write((json.dumps(final) + "\n").encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early
+            pass
+
+def start_server(handler_class) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# --- Stage Timing ---
+
+class StageTimer:
+    """Collects wall-clock durations per pipeline stage, from any thread."""
+
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, stage: str, func):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.durations.setdefault(stage, []).append(time.perf_counter() - started)
+        return timed
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def peak_rss_mb() -> tuple:
+    """Returns (this process, reaped child processes) peak RSS in MB. ru_maxrss is in KB on Linux."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+# --- Benchmark Run ---
+
+def run_benchmark(args) -> dict:
+    random.seed(args.seed)
+
+    candidates = build_candidates(args.candidates)
+    LinkedInFixtureHandler.candidates = candidates
+    LinkedInFixtureHandler.templates = {
+        "card": load_template("search_card.html"),
+        "search": load_template("search.html"),
+        "profile": load_template("profile.html"),
+        "experience": load_template("experience_item.html"),
+        "skills": load_template("skills.html"),
+        "skill": load_template("skill_item.html"),
+        "feed": load_template("feed.html"),
+        "search_payload": load_template("search_payload.json"),
+        "search_entity": load_template("search_entity.json"),
+    }
+    OllamaStubHandler.latency = args.llm_latency
+    OllamaStubHandler.prompt_ms_per_1k_tokens = args.llm_prompt_ms_per_1k
+    # Each stub server has its own slots, counters and prompt cache, like separate Ollama boxes
+    stub_handlers = [
+        type(f"OllamaStubHandler{i}", (OllamaStubHandler,), {
+            "slots": threading.Semaphore(args.llm_parallel), "chat_requests": 0, "prompt_tokens": 0,
+            "last_system": None, "failing": i >= args.ollama_stubs - args.ollama_failing,
+        })
+        for i in range(max(1, args.ollama_stubs))
+    ]
+
+    linkedin_server = start_server(LinkedInFixtureHandler)
+    LinkedInFixtureHandler.base_url = f"http://127.0.0.1:{linkedin_server.server_address[1]}"
+    ollama_servers = [start_server(handler) for handler in stub_handlers]
+
+    # Work in an empty directory so caches, the profile store and output start cold on every run
+    workdir = tempfile.mkdtemp(prefix="recruiter-bench-")
+    os.chdir(workdir)
+
+    import llm_handler
+    import recruiter_agent
+    from jobs import configured_jobs
+    from rate_limiter import NavigationScheduler
+
+    with open(recruiter_agent.SESSION_FILE, "w", encoding="utf-8") as f:
+        json.dump({"cookies": [], "origins": []}, f)
+
+    recruiter_agent.LINKEDIN_BASE_URL = LinkedInFixtureHandler.base_url
+    recruiter_agent.MAX_CANDIDATES_TO_FIND = args.candidates
+    recruiter_agent.DELAY_SCALE = args.delay_scale
+    recruiter_agent.SEARCH_EXTRACTION = args.search_extraction
+    recruiter_agent.GOAL_CANDIDATES = args.goal_candidates
+    recruiter_agent.GOAL_MIN_LEAD_SCORE = args.goal_min_score
+    if args.delay_scale > 0:
+        low, high = recruiter_agent.NAVIGATION_JITTER_SECONDS
+        recruiter_agent.navigation_scheduler = NavigationScheduler(
+            recruiter_agent.NAVIGATIONS_PER_MINUTE / args.delay_scale, recruiter_agent.NAVIGATION_BURST,
+            (low * args.delay_scale, high * args.delay_scale))
+    else:
+        recruiter_agent.navigation_scheduler = NavigationScheduler(1e9, 1, (0, 0))
+    ollama_hosts = [f"http://127.0.0.1:{server.server_address[1]}" for server in ollama_servers]
+    llm_handler.OLLAMA_ENDPOINT = ollama_hosts[0]
+    if len(ollama_hosts) > 1:
+        llm_handler.OLLAMA_ENDPOINTS = [{"host": host, "max_concurrent": args.llm_parallel} for host in ollama_hosts]
+        # Enough scoring workers to keep every stub server busy
+        recruiter_agent.SCORING_WORKERS = max(recruiter_agent.SCORING_WORKERS, len(ollama_hosts) * args.llm_parallel)
+
+    timer = StageTimer()
+    recruiter_agent.search_for_candidates = timer.wrap("search", recruiter_agent.search_for_candidates)
+    recruiter_agent.scrape_linkedin_profile = timer.wrap("profile_scrape", recruiter_agent.scrape_linkedin_profile)
+    recruiter_agent.score_candidate = timer.wrap("score_candidate", recruiter_agent.score_candidate)
+    recruiter_agent.score_candidates = timer.wrap("score_candidates", recruiter_agent.score_candidates)
+    llm_handler.generate_candidate_insights = timer.wrap("llm_insights", llm_handler.generate_candidate_insights)
+    llm_handler.generate_batch_insights = timer.wrap("llm_batch_insights", llm_handler.generate_batch_insights)
+
+    started = time.perf_counter()
+    recruiter_agent.run_agent()
+    wall_seconds = time.perf_counter() - started
+
+    scored = 0
+    for job in configured_jobs():
+        if os.path.exists(job["journal_file"]):
+            with open(job["journal_file"], encoding="utf-8") as f:
+                scored += sum(1 for line in f if line.strip())
+    own_rss, child_rss = peak_rss_mb()
+
+    linkedin_server.shutdown()
+    for server in ollama_servers:
+        server.shutdown()
+
+    return {
+        "candidates": args.candidates,
+        "scored": scored,
+        "llm_latency": args.llm_latency,
+        "delay_scale": args.delay_scale,
+        "search_extraction": args.search_extraction,
+        "goal_candidates": args.goal_candidates,
+        "wall_seconds": round(wall_seconds, 2),
+        "candidates_per_minute": round(scored / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "llm_requests": sum(handler.chat_requests for handler in stub_handlers),
+        "llm_prompt_tokens": sum(handler.prompt_tokens for handler in stub_handlers),
+        "llm_requests_per_stub": [handler.chat_requests for handler in stub_handlers],
+        "stages": {
+            stage: {
+                "calls": len(values),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "total": round(sum(values), 2),
+            }
+            for stage, values in timer.durations.items()
+        },
+        "peak_rss_mb": round(own_rss, 1),
+        "peak_child_rss_mb": round(child_rss, 1),
+        "workdir": workdir,
+    }
+
+def print_report(result: dict):
+    print("\n=== Benchmark Results ===")
+    print(f"Candidates: {result['scored']}/{result['candidates']} scored in {result['wall_seconds']}s "
+          f"({result['candidates_per_minute']} candidates/min)")
+    print(f"LLM latency: {result['llm_latency']}s per request, {result['llm_requests']} chat request(s) "
+          f"with {result['llm_prompt_tokens']} prompt tokens, delay scale: {result['delay_scale']}")
+    if len(result["llm_requests_per_stub"]) > 1:
+        print(f"Chat requests per stub server: {', '.join(str(count) for count in result['llm_requests_per_stub'])}")
+    print(f"{'Stage':<18}{'calls':>7}{'p50 (s)':>10}{'p95 (s)':>10}{'total (s)':>11}")
+    for stage, stats in result["stages"].items():
+        print(f"{stage:<18}{stats['calls']:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['total']:>11.2f}")
+    print(f"Peak RSS: {result['peak_rss_mb']} MB (agent), {result['peak_child_rss_mb']} MB (largest reaped child process)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark run_agent against local LinkedIn fixtures and a stub Ollama server.")
+    parser.add_argument("--candidates", type=int, default=25, help="number of candidates in the fixture search results")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds the stub Ollama server takes per chat request")
+    parser.add_argument("--llm-prompt-ms-per-1k", type=float, default=0.0,
+                        help="extra milliseconds per 1000 prompt tokens, to model prompt evaluation cost")
+    parser.add_argument("--llm-parallel", type=int, default=1, help="chat requests the stub server runs at once")
+    parser.add_argument("--ollama-stubs", type=int, default=1,
+                        help="number of stub Ollama servers; more than one are used through OLLAMA_ENDPOINTS")
+    parser.add_argument("--ollama-failing", type=int, default=0,
+                        help="how many of the stub servers answer every chat request with an error")
+    parser.add_argument("--delay-scale", type=float, default=0.0,
+                        help="multiplier for human_like_delay and navigation pacing (0 disables all sleeps)")
+    parser.add_argument("--search-extraction", choices=("network", "dom"), default="network",
+                        help="read search results from the search API responses or from the rendered result cards")
+    parser.add_argument("--goal-candidates", type=int, default=None,
+                        help="run in goal mode: stop once this many candidates reach --goal-min-score")
+    parser.add_argument("--goal-min-score", type=float, default=7.0, help="lead score a candidate needs to count towards the goal")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for delays and jitter")
+    parser.add_argument("--json", help="append the results as one JSON line to this file, for run-to-run comparison")
+    args = parser.parse_args()
+
+    # run_benchmark changes into a temporary directory, so resolve the output path first
+    json_path = os.path.abspath(args.json) if args.json else None
+    result = run_benchmark(args)
+    print_report(result)
+    if json_path:
+        with open(json_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
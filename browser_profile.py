@@ -0,0 +1,88 @@
+import threading
+
+# Resource types that are never needed to read text off a page.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+# Third-party analytics and tracking requests, matched as substrings of the request URL.
+BLOCKED_URL_PARTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "bat.bing.com",
+    "px.ads.linkedin.com",
+    "/li/track",
+    "sentry.io",
+    "hotjar.com",
+)
+
+def _block_unneeded_requests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        route.abort("blockedbyclient")
+    else:
+        route.continue_()
+
+def enable_lean_routing(context):
+    """Aborts images, media, fonts and third-party analytics for every page in the context."""
+    context.route("**/*", _block_unneeded_requests)
+
+class PageStats:
+    """Byte, request and navigation-time counters for one browser page."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.responses = 0
+        self.bytes_received = 0
+        self.blocked = 0
+        self.navigations = 0
+        self.navigation_seconds = 0.0
+
+    def on_response(self, response):
+        self.responses += 1
+
+    def on_request_finished(self, request):
+        # The body size as transferred, so chunked and compressed responses without a content-length count too
+        try:
+            size = request.sizes()["responseBodySize"]
+        except Exception:
+            return
+        if size > 0:
+            self.bytes_received += size
+
+    def on_request_failed(self, request):
+        if request.failure and "ERR_BLOCKED_BY_CLIENT" in request.failure:
+            self.blocked += 1
+
+    def record_navigation(self, seconds: float):
+        self.navigations += 1
+        self.navigation_seconds += seconds
+
+_page_stats = {}
+_stats_lock = threading.Lock()
+
+def new_tracked_page(context, name: str):
+    """Opens a page in the context and starts counting its bytes, requests and navigation time."""
+    page = context.new_page()
+    stats = PageStats(name)
+    page.on("response", stats.on_response)
+    page.on("requestfinished", stats.on_request_finished)
+    page.on("requestfailed", stats.on_request_failed)
+    with _stats_lock:
+        _page_stats[page] = stats
+    return page
+
+def stats_for(page):
+    """Returns the PageStats for a tracked page, or None."""
+    with _stats_lock:
+        return _page_stats.get(page)
+
+def print_page_stats():
+    """Prints one line of counters per tracked page."""
+    with _stats_lock:
+        all_stats = list(_page_stats.values())
+    if not all_stats:
+        return
+    print("\nBrowser page statistics:")
+    for stats in all_stats:
+        average = stats.navigation_seconds / stats.navigations if stats.navigations else 0.0
+        print(f"  {stats.name}: {stats.navigations} navigations ({average:.1f}s avg), "
+              f"{stats.responses} responses, {stats.bytes_received / 1024:.0f} KB received, {stats.blocked} requests blocked")
@@ -0,0 +1,81 @@
+import csv
+import json
+import os
+import threading
+
+# Columns of the output CSV, in order. Every run writes the same header,
+# whatever fields the first scored candidate happens to have.
+OUTPUT_FIELDS = [
+    "LinkedIn",
+    "Name",
+    "Current Role",
+    "Location",
+    "Core Skills",
+    "Personalised Sentence",
+    "Relevance Score",
+    "Tenure Score",
+    "Activity Score",
+    "Lead Score",
+]
+
+def read_journal(journal_path: str) -> list:
+    """Returns every record in a JSONL journal, skipping a partially written last line."""
+    records = []
+    if not os.path.exists(journal_path):
+        return records
+    with open(journal_path, encoding='utf-8') as journal:
+        for line in journal:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Skipping a corrupt line in {journal_path}.")
+    return records
+
+class CandidateJournal:
+    """
+    Writes each scored candidate to a JSONL journal and the output CSV as soon
+    as it is scored, flushing both so a crash loses at most the candidate in flight.
+
+    With resume=True the existing files are kept and appended to, and
+    completed_urls holds the profiles that do not need to be processed again.
+    """
+
+    def __init__(self, journal_path: str, csv_path: str, resume: bool = False):
+        self.journal_path = journal_path
+        self.csv_path = csv_path
+        self.completed_urls = set()
+        self.records_written = 0
+        self._lock = threading.Lock()
+
+        if resume:
+            self.completed_urls = {record.get("LinkedIn") for record in read_journal(journal_path)}
+            mode = 'a'
+        else:
+            mode = 'w'
+
+        self._journal = open(journal_path, mode, encoding='utf-8')
+        write_header = mode == 'w' or not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+        self._csvfile = open(csv_path, mode, newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._csvfile, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+        if write_header:
+            self._writer.writeheader()
+            self._csvfile.flush()
+
+    def append(self, record: dict):
+        """Appends one scored candidate to both files and flushes them to disk."""
+        with self._lock:
+            self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._writer.writerow(record)
+            self._csvfile.flush()
+            self.completed_urls.add(record.get("LinkedIn"))
+            self.records_written += 1
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+            self._csvfile.close()
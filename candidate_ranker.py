@@ -0,0 +1,91 @@
+import re
+
+import numpy as np
+
+import llm_handler
+from profile_distiller import distill_profile
+
+# Words that say nothing about whether a profile matches a job.
+STOP_WORDS = frozenset("""
+a an and or the of to in for with on at by is are be as we you our your this that from will have has it its into
+other such etc e g i.e about who what not none stated
+""".split())
+
+# A long job description has more terms than any profile mentions, so at most this many count towards the share.
+MAX_COUNTED_TERMS = 30
+
+def profile_embedding_text(profile: dict) -> str:
+    """Builds the text that represents a candidate for pre-ranking: headline, summary and skills."""
+    parts = [
+        profile.get("Current Role") or "",
+        profile.get("summary") if profile.get("summary") != "N/A" else "",
+        profile.get("Core Skills") or "",
+    ]
+    return "\n".join(part for part in parts if part)
+
+def text_terms(text: str) -> set:
+    """Returns the lowercased words of a text, without stop words. Keeps terms like c++, c# and tcp/ip together."""
+    return {word for word in re.findall(r"[a-z0-9][a-z0-9+#]*", (text or "").lower())
+            if len(word) > 1 and word not in STOP_WORDS}
+
+def job_terms(job_description: str) -> set:
+    """
+    Returns the terms candidates are screened against: the words of the
+    compiled requirements spec (the full description if it was not compiled).
+    """
+    spec = llm_handler.compile_job_spec(job_description)
+    # Only what follows the spec's "- Must-haves:" style labels
+    return text_terms("\n".join(line.split(":", 1)[-1] for line in spec.splitlines()))
+
+def keyword_overlap(profile: dict, terms: set) -> float:
+    """
+    Returns the share of the job terms that appear in a profile's role,
+    location and distilled page text. A cheap, local relevance check.
+    """
+    if not terms:
+        return 1.0
+    text = "\n".join([profile.get("Current Role") or "", profile.get("Location") or "", distill_profile(profile)])
+    return len(text_terms(text) & terms) / min(len(terms), MAX_COUNTED_TERMS)
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+class PreRanker:
+    """
+    Ranks candidates by embedding similarity to the job description, so only the
+    most promising ones go on to the full LLM scoring.
+
+    The job description is embedded once. Candidates are embedded in one batch
+    request and compared with a single matrix-vector product.
+    """
+
+    def __init__(self, job_description: str):
+        embeddings = llm_handler.embed_texts([job_description])
+        if not embeddings:
+            raise RuntimeError("Could not embed the job description.")
+        self.job_vector = _normalize_rows(np.asarray(embeddings[0], dtype=np.float32))
+
+    def similarities(self, profiles: list) -> np.ndarray:
+        """Returns the cosine similarity of each profile to the job description."""
+        embeddings = llm_handler.embed_texts([profile_embedding_text(profile) for profile in profiles])
+        if not embeddings:
+            raise RuntimeError("Could not embed the candidate profiles.")
+        matrix = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        return matrix @ self.job_vector
+
+    def select(self, profiles: list, top_k: int = None, min_similarity: float = None) -> list:
+        """
+        Returns the indices of the profiles worth scoring, best first.
+
+        Profiles below min_similarity are dropped, then at most top_k are kept.
+        """
+        if not profiles:
+            return []
+        scores = self.similarities(profiles)
+        order = np.argsort(-scores)
+        if min_similarity is not None:
+            order = order[scores[order] >= min_similarity]
+        if top_k is not None:
+            order = order[:top_k]
+        return order.tolist()
@@ -51,3 +51,112 @@ LEAD_SCORE_WEIGHTS = {
 # The script checks if all keywords in this list are present in the role string.
 # The check is case-insensitive.As expert recruiters, include the necessary keywords that are essential for the role.
 REQUIRED_KEYWORDS = []
+
+# --- Multi-Job Runs ---
+# Source for several open roles in one run. Every job's search runs in the same browser session, profiles found by
+# more than one search are scraped once, and each profile is scored only against the jobs whose search found it.
+# Each job needs a 'title' (the LinkedIn search) and a 'description'. 'name', 'weights', 'required_keywords' and
+# 'output_file' are optional and default to the job title, the settings above and 'recruited_<name>.csv' (with a
+# matching .jsonl journal). When the list is empty, the single job above is used. For example:
+# JOBS = [
+#     {'title': 'Norway (C++)', 'description': JOB_DESCRIPTION},
+#     {'name': 'SRE Oslo', 'title': 'Site Reliability Engineer Oslo', 'description': '...',
+#      'weights': {'relevance': 0.6, 'tenure': 0.2, 'activity': 0.2}, 'required_keywords': ['reliability']},
+# ]
+JOBS = []
+
+# --- Goal Mode ---
+# Set GOAL_CANDIDATES to stop as soon as that many candidates per job have a lead score of at least GOAL_MIN_LEAD_SCORE,
+# instead of scraping and scoring everything the search finds. Search pages are then read one at a time, interleaved
+# with scraping and scoring, and the next page is only loaded when more candidates are needed. MAX_CANDIDATES_TO_FIND
+# still caps how many results are taken from each search. With several jobs, they are searched one after another.
+# None runs the usual collect-everything mode.
+GOAL_CANDIDATES = None
+GOAL_MIN_LEAD_SCORE = 7.0
+# Optional budget for goal mode: stop after this many minutes, or stop searching after this many search result pages
+# across all jobs. None means no limit.
+GOAL_MAX_MINUTES = None
+GOAL_MAX_SEARCH_PAGES = None
+
+# --- Search ---
+# 'network' reads the search results from the JSON the search page downloads from LinkedIn's API and fetches the
+# following pages' JSON directly, requesting each next page as soon as the current one is parsed. 'dom' reads the
+# rendered result cards and clicks "Next". The network mode falls back to the result cards if no payload is seen.
+SEARCH_EXTRACTION = 'network'
+# How long (in milliseconds) to wait for the search API response after the search page has loaded.
+SEARCH_PAYLOAD_TIMEOUT_MS = 10000
+
+# --- Pipelining ---
+# When True, the LLM scores candidates on background threads while the browser keeps scraping the next profiles.
+PIPELINED_SCORING = True
+# Number of scoring threads. Ollama handles one request at a time unless OLLAMA_NUM_PARALLEL is set on the server,
+# so more than one worker only helps when the server is configured for parallel requests, or when several servers are
+# listed in OLLAMA_ENDPOINTS (llm_handler.py). Match it to the total 'max_concurrent' of those servers.
+SCORING_WORKERS = 1
+# How many scraped profiles may wait for scoring before the browser pauses and lets the model catch up.
+SCORING_QUEUE_SIZE = 3
+# Most candidates a scoring worker sends to the LLM in one request. The job description is then sent once per batch
+# instead of once per candidate. Batches only form when profiles are waiting, and are split further if they would not
+# fit in the model's context window (MODEL_CONTEXT_TOKENS in llm_handler.py). Set to 1 to score one candidate per request.
+SCORING_BATCH_SIZE = 4
+
+# --- Incremental Scraping ---
+# When True, scraped profiles are kept in a local store and only re-visited when they are stale.
+INCREMENTAL_SCRAPE = True
+# SQLite file holding the scraped profiles, keyed by profile URL.
+PROFILE_STORE_FILE = 'profile_store.sqlite'
+# A stored profile is re-scraped once it is older than this, or earlier if its search-result headline changed.
+PROFILE_TTL_DAYS = 7
+
+# --- Tiered Scraping ---
+# When True, a profile's main page is scraped first and the skills page (a second navigation with its own delay) is
+# only visited if the main page already looks relevant to at least one of the candidate's jobs.
+TIERED_SCRAPING = True
+# Share of the job's requirement terms (from the compiled job spec) that must appear on the main profile page for the
+# skills page to be scraped. Lower it to deep-scrape more candidates.
+DEEP_SCRAPE_MIN_OVERLAP = 0.15
+
+# --- Parallel Scraping & Pacing ---
+# Number of browser pages that scrape profiles at the same time. Each one loads the saved LinkedIn session.
+SCRAPER_WORKERS = 1
+# Overall page-load budget shared by all pages. Parallel pages overlap their waits but never exceed this rate.
+NAVIGATIONS_PER_MINUTE = 8
+# How many navigations may happen back to back before the rate limit applies.
+NAVIGATION_BURST = 1
+# Random extra wait (min, max seconds) added to each navigation so page loads are not evenly spaced.
+NAVIGATION_JITTER_SECONDS = (1, 3)
+
+# --- Browser ---
+# 'lean' runs Chromium headless (once a session is saved), without slow_mo, and blocks images, media, fonts
+# and third-party analytics. 'full' is the original visible browser that loads everything.
+BROWSER_PROFILE = 'lean'
+
+# --- Embedding Pre-ranking ---
+# When True, scraped candidates are ranked by embedding similarity to the job description and only the best ones
+# are sent to the LLM for full scoring. Requires the embedding model in llm_handler.py (e.g. 'ollama pull nomic-embed-text').
+PRERANK_CANDIDATES = False
+# How many of the best-ranked candidates to score. Set to None to keep every candidate above the threshold.
+PRERANK_TOP_K = 10
+# Candidates with a cosine similarity below this are never scored. Set to None to use only the top-K cut.
+PRERANK_MIN_SIMILARITY = None
+
+# --- Output ---
+# Scored candidates are appended to both files as soon as they are scored.
+# The JSONL journal is what `python recruiter_agent.py --resume` reads to skip candidates that are already done.
+OUTPUT_CSV_FILE = 'recruited_candidates.csv'
+JOURNAL_FILE = 'recruited_candidates.jsonl'
+# Where `python recruiter_agent.py rerank` writes candidates re-scored with the current weights and keywords.
+RERANK_OUTPUT_FILE = 'reranked_candidates.csv'
+
+# --- Google Sheets (Optional) ---
+# Set this to the ID of a Google Sheet to also write scored candidates there. See google_sheets_handler.py for credentials.
+GOOGLE_SHEET_ID = None
+GOOGLE_WORKSHEET_NAME = 'Candidates'
+# Rows are sent in one request per batch, or once this many seconds have passed, to stay within the Sheets API quota.
+SHEET_BATCH_SIZE = 20
+SHEET_FLUSH_SECONDS = 30
+
+# --- Tracing ---
+# Timed spans (login, search pages, profile and skills scrapes, LLM calls, output writes) are written here as JSONL,
+# and a summary table is printed at the end of the run. Set to None to only print the summary.
+TRACE_FILE = 'run_trace.jsonl'
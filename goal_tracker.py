@@ -0,0 +1,110 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+
+class GoalTracker:
+    """
+    Tracks a goal-based run: find `target` candidates per job with a lead score
+    of at least min_lead_score, within an optional time and search-page budget.
+
+    Each job keeps a running top-K heap of its scored candidates, so the goal is
+    met once the heap is full and its lowest score reaches the threshold. The
+    tracker also counts the search pages, scrapes and LLM scorings the run did
+    and skipped, for the end-of-run report. It can be shared between threads.
+    """
+
+    def __init__(self, job_names: list, target: int, min_lead_score: float,
+                 max_minutes: float = None, max_search_pages: int = None):
+        self.target = max(1, target)
+        self.min_lead_score = min_lead_score
+        self.max_seconds = max_minutes * 60 if max_minutes else None
+        self.max_search_pages = max_search_pages
+        self.stop_reason = None # Why the run stopped early, if it did
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._order = itertools.count() # Tie-breaker so the heap never compares records
+        self._jobs = {
+            name: {
+                "heap": [], "search_pages": 0, "found": 0, "search_exhausted": False,
+                "scraped": 0, "skipped_scrapes": 0, "scored": 0, "skipped_scorings": 0,
+            }
+            for name in job_names
+        }
+
+    def add(self, job_name: str, record: dict) -> bool:
+        """Adds a scored candidate to the job's top-K heap. Returns True if this met the job's goal."""
+        with self._lock:
+            job = self._jobs[job_name]
+            was_met = self._met(job)
+            heapq.heappush(job["heap"], (record.get("Lead Score") or 0, next(self._order), record))
+            if len(job["heap"]) > self.target:
+                heapq.heappop(job["heap"])
+            return self._met(job) and not was_met
+
+    def _met(self, job: dict) -> bool:
+        return len(job["heap"]) >= self.target and job["heap"][0][0] >= self.min_lead_score
+
+    def job_met(self, job_name: str) -> bool:
+        with self._lock:
+            return self._met(self._jobs[job_name])
+
+    def out_of_time(self) -> bool:
+        return self.max_seconds is not None and time.monotonic() - self._started >= self.max_seconds
+
+    def out_of_search_pages(self) -> bool:
+        with self._lock:
+            pages = sum(job["search_pages"] for job in self._jobs.values())
+        return self.max_search_pages is not None and pages >= self.max_search_pages
+
+    def wants(self, job_name: str) -> bool:
+        """True while more scraping and scoring for this job could still help."""
+        return not self.out_of_time() and not self.job_met(job_name)
+
+    def count(self, job_name: str, counter: str, amount: int = 1):
+        """Adds to one of the job's counters (search_pages, found, scraped, skipped_scrapes, scored, skipped_scorings)."""
+        with self._lock:
+            self._jobs[job_name][counter] += amount
+
+    def search_exhausted(self, job_name: str):
+        """Notes that the job's search ran out of results, so a full run would not have found more either."""
+        with self._lock:
+            self._jobs[job_name]["search_exhausted"] = True
+
+    def print_report(self, max_candidates: int, batch_size: int = 1):
+        """
+        Prints each job's top candidates and what the run skipped compared with
+        collecting max_candidates per job up front and scraping and scoring all
+        of them. Pages not fetched are estimated from the results per page seen.
+        """
+        with self._lock:
+            jobs = {name: dict(job, heap=list(job["heap"])) for name, job in self._jobs.items()}
+        elapsed = time.monotonic() - self._started
+
+        print(f"\n--- Goal Mode ({elapsed / 60:.1f} min) ---")
+        if self.stop_reason:
+            print(f"Stopped early: {self.stop_reason}.")
+        for name, job in jobs.items():
+            top = sorted(job["heap"], key=lambda item: (-item[0], item[1]))
+            qualified = [item for item in top if item[0] >= self.min_lead_score]
+            status = "goal reached" if self._met(job) else "goal not reached"
+            print(f"'{name}': {len(qualified)}/{self.target} candidate(s) with a lead score of at least"
+                  f" {self.min_lead_score} ({status}).")
+            for score, _, record in top:
+                print(f"  {score:>5}  {record.get('Name', 'N/A')} - {record.get('LinkedIn', '')}")
+
+            # A full run collects max_candidates (or everything, if the search runs out) and scrapes and scores them all
+            full_candidates = job["found"] if job["search_exhausted"] else max(job["found"], max_candidates)
+            per_page = job["found"] / job["search_pages"] if job["search_pages"] and job["found"] else None
+            full_pages = job["search_pages"] if job["search_exhausted"] or not per_page else math.ceil(full_candidates / per_page)
+            saved_pages = max(0, full_pages - job["search_pages"])
+            saved_scrapes = max(0, full_candidates - job["scraped"])
+            saved_scorings = max(0, full_candidates - job["scored"])
+            saved_calls = math.ceil(saved_scorings / max(1, batch_size))
+            print(f"  Fetched {job['search_pages']} search page(s) and found {job['found']} candidate(s). Scraped"
+                  f" {job['scraped']} (skipped {job['skipped_scrapes']}) and scored {job['scored']}"
+                  f" (dropped {job['skipped_scorings']} from the scoring queue).")
+            print(f"  Compared with scraping and scoring {full_candidates} candidate(s) up front, this saved"
+                  f" ~{saved_pages} search page(s), ~{saved_scrapes} profile scrape(s) and ~{saved_calls} LLM"
+                  f" scoring call(s){f' ({saved_scorings} candidates in batches of {batch_size})' if batch_size > 1 else ''}.")
@@ -1,5 +1,8 @@
+import random
+import threading
+import time
+
 import gspread
-import pandas as pd
 from google.oauth2.service_account import Credentials
 
 # The Agent will need access to Google Drive and Google sheets in order to write the final candidates data to a Google Sheet file
@@ -11,6 +14,9 @@ SCOPES = [
 # In order to use the Google Sheets API, you need to create a service account and download the credentials JSON file.
 SERVICE_ACCOUNT_FILE = 'credentials.json'
 
+# HTTP statuses from the Sheets API that are worth retrying (quota exceeded and transient server errors).
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503}
+
 def get_sheet_client():
     """Initializes and returns an authenticated gspread client."""
     creds = Credentials.from_service_account_file(
@@ -18,10 +24,133 @@ def get_sheet_client():
     client = gspread.authorize(creds)
     return client
 
+class SheetWriter:
+    """
+    Buffers candidate rows and appends them to a worksheet in batches.
+
+    The client, worksheet and header row are fetched once and cached. Rows are
+    sent with a single append_rows call once batch_size rows are buffered or
+    flush_interval seconds have passed since the last flush (checked on each
+    add). add() makes one attempt and never sleeps, since it runs on the
+    scoring threads: after a failure the rows stay buffered and add() does not
+    try again until a cooldown has passed, doubling on each further failure.
+    flush() and close() retry quota errors with exponential backoff instead.
+    A client can be passed in, e.g. an in-memory fake gspread client in tests.
+    """
+
+    def __init__(self, sheet_id, worksheet_name, batch_size=20, flush_interval=30.0,
+                 max_retries=5, backoff_seconds=2.0, client=None):
+        self.sheet_id = sheet_id
+        self.worksheet_name = worksheet_name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.rows_written = 0
+        self._client = client
+        self._worksheet = None
+        self._header = None
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._failures = 0 # Failed flushes in a row
+        self._retry_after = 0.0 # add() does not flush before this time after a failure
+        self._lock = threading.Lock() # Guards the buffer and counters; never held during a request
+        self._flush_lock = threading.Lock() # One flush at a time, so rows are appended in order
+
+    def _with_retries(self, retries, func, *args, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if status not in RETRYABLE_STATUS_CODES or attempt == retries:
+                    raise
+                wait = self.backoff_seconds * (2 ** attempt) + random.uniform(0, 1)
+                print(f"Google Sheets returned {status}, retrying in {wait:.1f}s...")
+                time.sleep(wait)
+
+    def _get_worksheet(self, retries):
+        if self._worksheet is None:
+            if self._client is None:
+                self._client = get_sheet_client()
+            spreadsheet = self._with_retries(retries, self._client.open_by_key, self.sheet_id)
+            self._worksheet = self._with_retries(retries, spreadsheet.worksheet, self.worksheet_name)
+        return self._worksheet
+
+    def _get_header(self, candidate_data, retries):
+        if self._header is None:
+            worksheet = self._get_worksheet(retries)
+            header = self._with_retries(retries, worksheet.row_values, 1)
+            if not header:
+                # If sheet is empty, write header first
+                header = list(candidate_data.keys())
+                self._with_retries(retries, worksheet.update, [header], 'A1')
+            self._header = header
+        return self._header
+
+    def add(self, candidate_data):
+        """
+        Buffers one candidate row and, when the batch is full or the flush
+        interval has passed, tries once to append the buffered rows. Raises if
+        that attempt fails; the rows stay buffered either way.
+        """
+        with self._lock:
+            # Rows are built at flush time, so a failure to read the header cannot lose the candidate
+            self._buffer.append(candidate_data)
+            now = time.monotonic()
+            due = len(self._buffer) >= self.batch_size or now - self._last_flush >= self.flush_interval
+            if not due or now < self._retry_after:
+                return
+        # If another thread is already flushing, these rows go out with the next flush
+        if self._flush_lock.acquire(blocking=False):
+            try:
+                self._flush(retries=0)
+            finally:
+                self._flush_lock.release()
+
+    def flush(self):
+        """Appends every buffered row in a single request, retrying quota errors. Rows stay buffered if it fails."""
+        with self._flush_lock:
+            self._flush(self.max_retries)
+
+    def _flush(self, retries):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            candidates = self._buffer
+            self._buffer = []
+        if not candidates:
+            return
+        try:
+            header = self._get_header(candidates[0], retries)
+            # Order the values to match the sheet header
+            rows = [["" if candidate_data.get(column) is None else candidate_data.get(column) for column in header]
+                    for candidate_data in candidates]
+            self._with_retries(retries, self._get_worksheet(retries).append_rows, rows)
+        except Exception:
+            with self._lock:
+                # Back in front of anything added meanwhile, so the sheet keeps the order candidates were scored in
+                self._buffer[:0] = candidates
+                self._failures += 1
+                cooldown = self.backoff_seconds * 2 ** min(self._failures - 1, self.max_retries)
+                self._retry_after = time.monotonic() + cooldown
+            raise
+        with self._lock:
+            self._failures = 0
+            self._retry_after = 0.0
+            self.rows_written += len(rows)
+        print(f"Appended {len(rows)} row(s) to '{self.worksheet_name}'.")
+
+    def close(self):
+        """Flushes any remaining rows."""
+        self.flush()
+
 def add_candidate_to_sheet(sheet_id, worksheet_name, candidate_data):
     """
     Adds a candidate's data as a new row to the specified Google Sheet and worksheet.
 
+    For more than one candidate, use a SheetWriter so the client, worksheet and
+    header are reused and rows are appended in batches.
+
     Args:
         sheet_id (str): The ID of the Google Sheet. You can find this in the URL
                         of your sheet (e.g., '.../spreadsheets/d/{sheet_id}/edit').
@@ -33,24 +162,9 @@ def add_candidate_to_sheet(sheet_id, worksheet_name, candidate_data):
         bool: True if the row was added successfully, False otherwise.
     """
     try:
-        client = get_sheet_client()
-        spreadsheet = client.open_by_key(sheet_id)
-        worksheet = spreadsheet.worksheet(worksheet_name)
-
-        # Converts the dictionary to a DataFrame, then to a list of lists
-        # This ensures the data is in the correct format for appending.
-        df = pd.DataFrame([candidate_data])
-        
-        # Get header from worksheet to ensure order
-        header = worksheet.row_values(1)
-        if not header:
-            # If sheet is empty, write header first
-            worksheet.update([df.columns.values.tolist()], 'A1')
-            header = df.columns.values.tolist()
-
-        # Reorder dataframe to match sheet header and append
-        row_to_append = df[header].values.tolist()
-        worksheet.append_rows(row_to_append)
+        writer = SheetWriter(sheet_id, worksheet_name, batch_size=1)
+        writer.add(candidate_data)
+        writer.close()
         
         print(f"Successfully added candidate to '{worksheet_name}'.")
         return True
@@ -0,0 +1,54 @@
+import os
+import re
+
+from config import JOBS, SEARCH_JOB_TITLE, JOB_DESCRIPTION, LEAD_SCORE_WEIGHTS, REQUIRED_KEYWORDS
+from config import OUTPUT_CSV_FILE, JOURNAL_FILE, RERANK_OUTPUT_FILE
+
+def job_slug(name: str) -> str:
+    """Turns a job name into a string that is safe to use in file names."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "job"
+
+def configured_jobs() -> list:
+    """
+    Returns the jobs to source for as dicts with a name, search title,
+    description, lead score weights, required keywords and output files.
+
+    When JOBS is empty this is the single job described by SEARCH_JOB_TITLE,
+    JOB_DESCRIPTION and the other settings in config.py, with the usual output
+    files. Jobs in JOBS fall back to those settings for anything they leave out
+    and get output files named after the job.
+    """
+    if not JOBS:
+        return [{
+            "name": SEARCH_JOB_TITLE,
+            "title": SEARCH_JOB_TITLE,
+            "description": JOB_DESCRIPTION,
+            "weights": LEAD_SCORE_WEIGHTS,
+            "required_keywords": REQUIRED_KEYWORDS,
+            "output_file": OUTPUT_CSV_FILE,
+            "journal_file": JOURNAL_FILE,
+            "rerank_file": RERANK_OUTPUT_FILE,
+        }]
+
+    jobs = []
+    for job in JOBS:
+        name = job.get("name") or job["title"]
+        slug = job_slug(name)
+        output_file = job.get("output_file") or f"recruited_{slug}.csv"
+        jobs.append({
+            "name": name,
+            "title": job["title"],
+            "description": job["description"],
+            "weights": job.get("weights") or LEAD_SCORE_WEIGHTS,
+            "required_keywords": job.get("required_keywords", REQUIRED_KEYWORDS),
+            "output_file": output_file,
+            "journal_file": os.path.splitext(output_file)[0] + ".jsonl",
+            "rerank_file": f"reranked_{slug}.csv",
+        })
+
+    # Records are routed to their job's output by name, so names must be unique
+    names = [job["name"] for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Job names in JOBS must be unique; give these a distinct 'name': {', '.join(duplicates)}")
+    return jobs
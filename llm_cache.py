@@ -0,0 +1,104 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# The profile fields that go into the prompt. Only these are part of the cache key,
+# so changes to other scraped fields do not invalidate a cached score.
+PROFILE_KEY_FIELDS = ("Name", "Current Role", "Location", "Core Skills", "summary", "full_text")
+
+def _normalize(value) -> str:
+    """Collapses whitespace and case so cosmetic changes to a profile still hit the cache."""
+    return " ".join(str(value or "").split()).lower()
+
+def make_cache_key(candidate_profile: dict, job_description: str, model_name: str, prompt_version: str) -> str:
+    """Builds a content hash from the normalized profile, the job description, the model and the prompt version."""
+    payload = {
+        "profile": {field: _normalize(candidate_profile.get(field)) for field in PROFILE_KEY_FIELDS},
+        "job_description": _normalize(job_description),
+        "model": model_name,
+        "prompt_version": prompt_version,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+class InsightsCache:
+    """
+    A persistent SQLite cache of LLM insights keyed by content hash.
+
+    Entries older than max_age_days are ignored and removed, and the table is
+    trimmed to the max_entries most recently used rows. The instance can be
+    shared between the scoring threads.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, max_age_days: float = 30):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS insights ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key: str):
+        """Returns the cached insights for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM insights WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE insights SET last_used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, insights: dict):
+        """Stores insights under a key, replacing any older entry."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO insights (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(insights, ensure_ascii=False), now, now),
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """Removes expired entries and trims the cache to max_entries, dropping the least recently used first."""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            self._conn.execute("DELETE FROM insights WHERE created_at < ?", (cutoff,))
+            self._conn.execute(
+                "DELETE FROM insights WHERE key NOT IN"
+                " (SELECT key FROM insights ORDER BY last_used_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the current number of entries."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM insights").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,25 +1,375 @@
-import ollama
+import hashlib
 import json
+import re
+import threading
+from functools import lru_cache
+
+from llm_cache import InsightsCache, make_cache_key
+from ollama_pool import EndpointPool, OllamaEndpoint
+from profile_distiller import distill_profile, estimate_tokens
+from tracing import span, tracer
 
 # --- Configuration ---
 # This is the default model we'll use and runs in the local environment
 MODEL_NAME = 'llama3.2'
 # This is the default local endpoint for Ollama.
 OLLAMA_ENDPOINT = 'http://localhost:11434'
+# Ollama servers to spread LLM requests over, as {'host': ..., 'max_concurrent': ...}. 'max_concurrent' (requests sent
+# to that server at once, its OLLAMA_NUM_PARALLEL) defaults to 1. Every server runs MODEL_NAME, so cached insights stay
+# valid whichever server produced them. When empty, only OLLAMA_ENDPOINT is used.
+# For example:
+# OLLAMA_ENDPOINTS = [
+#     {'host': 'http://localhost:11434'},
+#     {'host': 'http://gpu-box:11434', 'max_concurrent': 4},
+# ]
+OLLAMA_ENDPOINTS = []
+# How long a server that failed a request or health check is left out of the pool. Doubles on each further failure.
+ENDPOINT_EJECT_SECONDS = 30
+ENDPOINT_MAX_EJECT_SECONDS = 600
+# Local embedding model used to pre-rank candidates before the expensive chat scoring.
+EMBEDDING_MODEL = 'nomic-embed-text'
+# How long a successful health check (server up and model available) is trusted before it is repeated.
+HEALTH_CHECK_TTL_SECONDS = 300
+# How long Ollama keeps the model loaded after a request. Keeps the model in memory between candidates.
+MODEL_KEEP_ALIVE = '30m'
+# Bump this whenever the prompt changes so old cached insights are no longer used.
+PROMPT_VERSION = '3'
+# When True, the job description is condensed once per run into a short requirements spec (must-haves,
+# nice-to-haves, seniority, location) that replaces the full text in every scoring prompt.
+PRECOMPILE_JOB_DESCRIPTION = True
+# Approximate number of tokens of profile text (experience, about, skills) sent to the model per candidate.
+PROFILE_TOKEN_BUDGET = 600
+# Context window requested from Ollama (num_ctx). Batch sizes are chosen so prompt and answers fit in it.
+MODEL_CONTEXT_TOKENS = 8192
+# Most candidates scored in one batched request, and the tokens reserved for each candidate's answer.
+MAX_BATCH_SIZE = 8
+RESPONSE_TOKENS_PER_CANDIDATE = 120
+# Sampling temperature for scoring. Low values keep scores consistent between runs.
+SCORING_TEMPERATURE = 0.2
+# SQLite file that caches insights per profile/job/model/prompt. Set to None to disable the cache.
+LLM_CACHE_FILE = 'llm_cache.sqlite'
+# The cache keeps at most this many entries and ignores anything older than the age limit.
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_MAX_AGE_DAYS = 30
+
+# --- Endpoint Pool ---
+# One pool (and one client per server) is shared by every call in the process.
+_pool = None
+_client_lock = threading.Lock()
+
+def get_llm_pool() -> EndpointPool:
+    """
+    Returns the shared pool of Ollama servers, built from OLLAMA_ENDPOINTS (or
+    OLLAMA_ENDPOINT) on first use. Every LLM call leases a server from it.
+    """
+    global _pool
+    with _client_lock:
+        if _pool is None:
+            if OLLAMA_ENDPOINTS:
+                endpoints = [OllamaEndpoint(e['host'], MODEL_NAME, e.get('max_concurrent', 1))
+                             for e in OLLAMA_ENDPOINTS]
+            else:
+                # A single server is not limited here; SCORING_WORKERS decides how many requests it gets
+                endpoints = [OllamaEndpoint(OLLAMA_ENDPOINT, MODEL_NAME, max_concurrent=1000)]
+            _pool = EndpointPool(endpoints, HEALTH_CHECK_TTL_SECONDS, ENDPOINT_EJECT_SECONDS, ENDPOINT_MAX_EJECT_SECONDS)
+        return _pool
+
+# --- Insights Cache ---
+_insights_cache = None
+
+def get_insights_cache():
+    """Returns the shared insights cache, opening it on first use. Returns None if caching is disabled."""
+    global _insights_cache
+    with _client_lock:
+        if _insights_cache is None and LLM_CACHE_FILE:
+            _insights_cache = InsightsCache(LLM_CACHE_FILE, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_AGE_DAYS)
+        return _insights_cache
+
+def insights_cache_key(candidate_profile: dict, job_description: str) -> str:
+    """Returns the cache key the insights for this profile and job description are stored under."""
+    # The budget changes what the model sees, so it is part of the prompt version
+    return make_cache_key(candidate_profile, job_description, MODEL_NAME, f"{PROMPT_VERSION}/{PROFILE_TOKEN_BUDGET}")
+
+def _candidate_details(candidate_profile: dict) -> str:
+    """Formats the profile fields shown to the model for one candidate."""
+    # Only the parts of the page that matter for scoring are sent, which keeps prompt evaluation short
+    profile_text = distill_profile(candidate_profile, PROFILE_TOKEN_BUDGET)
+    return f"""- Name: {candidate_profile.get('Name', 'N/A')}
+    - Current Role: {candidate_profile.get('Current Role', 'N/A')}
+    - Location: {candidate_profile.get('Location', 'N/A')}
+    - Core Skills: {candidate_profile.get('Core Skills', 'N/A')}
+    - Profile Details (experience with dates for tenure analysis, about, skills):
+    {profile_text or 'N/A'}"""
+
+# --- Job Context ---
+# The scoring criteria, part of the system message shared by the single and batch prompts.
+SCORING_CRITERIA = """1.  **`relevance_score`**: On a scale of 1 to 10, how well does the candidate's experience (skills, titles, industry) match the job requirements?
+2.  **`tenure_score`**: On a scale of 1 to 10, estimate the candidate's readiness to move based on their time in the current role. A higher score (7-10) means they are in a typical window to consider a change (e.g., 1.5 to 4 years). A lower score means they are either too new (<1 year) or too tenured (>5 years).
+3.  **`activity_score`**: On a scale of 1 to 10, estimate the candidate's job-seeking activity. Look for explicit signals like an "Open to Work" banner or recent relevant posts. If no signals are present, give a neutral score of 3-5.
+4.  **`personalised_sentence`**: Write a short, compelling, and personalized sentence (max 250 characters) that a recruiter could use. This sentence must directly reference a specific detail from the candidate's profile *in relation to the job*."""
+
+_job_spec_lock = threading.Lock()
 
-def get_llm_client():
-    """Initializes and returns an Ollama client."""
+def _render_job_spec(spec: dict) -> str:
+    def listed(key):
+        items = [str(item).strip() for item in spec.get(key) or [] if str(item).strip()]
+        return "; ".join(items) or "none stated"
+    return "\n".join([
+        f"- Must-haves: {listed('must_haves')}",
+        f"- Nice-to-haves: {listed('nice_to_haves')}",
+        f"- Seniority: {spec.get('seniority') or 'not stated'}",
+        f"- Location: {spec.get('location') or 'not stated'}",
+    ])
+
+@lru_cache(maxsize=32)
+def _compile_job_spec(job_description: str) -> str:
+    if not PRECOMPILE_JOB_DESCRIPTION:
+        return job_description.strip()
+
+    prompt = f"""
+    Condense the job description below into the requirements a sourcer screens candidates against.
+    Reply with a single JSON object:
+    {{
+      "must_haves": ["<short requirement>", ...],
+      "nice_to_haves": ["<short requirement>", ...],
+      "seniority": "<e.g. senior, 5+ years>",
+      "location": "<city/country or remote>"
+    }}
+
+    **Job Description:**
+    ---
+    {job_description}
+    ---
+    """
     try:
-        client = ollama.Client(host=OLLAMA_ENDPOINT)
-        # check to see if the server is responsive
-        client.list() 
-        return client
+        with get_llm_pool().lease() as endpoint:
+            if endpoint is None:
+                return job_description.strip()
+            with span("job_spec_compile", model=endpoint.model, endpoint=endpoint.host) as llm_span:
+                response = endpoint.client.chat(
+                    model=endpoint.model,
+                    messages=[{'role': 'user', 'content': prompt}],
+                    format='json',
+                    options={'num_ctx': MODEL_CONTEXT_TOKENS, 'temperature': 0},
+                    keep_alive=MODEL_KEEP_ALIVE
+                )
+                tracer.record_llm_stats(llm_span, response)
+        spec = json.loads(response['message']['content'])
+        if not isinstance(spec, dict) or not spec.get("must_haves"):
+            raise ValueError("the model returned no must-haves")
+        rendered = _render_job_spec(spec)
+        print(f"Compiled the job description into a requirements spec:\n{rendered}")
+        return rendered
     except Exception as e:
-        print(f"Error connecting to Ollama at {OLLAMA_ENDPOINT}.")
-        print("Please ensure the Ollama application is running and the model is available.")
-        print(f"Underlying error: {e}")
+        # The full text still works, it just makes every prompt longer
+        print(f"Could not compile the job description, using the full text instead. Error: {e}")
+        return job_description.strip()
+
+def compile_job_spec(job_description: str) -> str:
+    """
+    Returns the requirements spec (must-haves, nice-to-haves, seniority,
+    location) for a job description. The spec is built with one LLM call the
+    first time and reused for the rest of the run.
+    """
+    # Held across the call so concurrent scoring workers all get the same spec
+    with _job_spec_lock:
+        return _compile_job_spec(job_description)
+
+def system_message(job_description: str) -> str:
+    """
+    The system message sent with every scoring call for this job. It is
+    byte-identical across calls, so Ollama can reuse the evaluated prefix.
+    """
+    return f"""You are an expert technical sourcer. Your task is to analyze candidates' profiles against the job below and generate actionable recruitment insights.
+
+**Job Requirements:**
+{compile_job_spec(job_description)}
+
+**Scoring:**
+Based *only* on the candidate's own profile and the job requirements, produce for each candidate:
+{SCORING_CRITERIA}
+
+Always answer with valid JSON only."""
+
+def _scoring_messages(job_description: str, user_prompt: str) -> list:
+    """Builds the system and user messages of a scoring call."""
+    return [{'role': 'system', 'content': system_message(job_description)}, {'role': 'user', 'content': user_prompt}]
+
+def _record_prompt(llm_span: dict, messages: list):
+    """Records which system prefix a call used and its estimated prompt size, for the prefix reuse metric."""
+    system_prompt = messages[0]['content']
+    tracer.record_prompt(
+        llm_span,
+        hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12],
+        sum(estimate_tokens(message['content']) for message in messages),
+    )
+
+# --- Structured Output ---
+# JSON schema for the four fields the model returns per candidate. Ollama constrains generation to it.
+INSIGHT_FIELD_SCHEMAS = {
+    "relevance_score": {"type": "integer", "minimum": 1, "maximum": 10},
+    "tenure_score": {"type": "integer", "minimum": 1, "maximum": 10},
+    "activity_score": {"type": "integer", "minimum": 1, "maximum": 10},
+    "personalised_sentence": {"type": "string", "maxLength": 250},
+}
+
+def _object_schema(properties: dict) -> dict:
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+INSIGHTS_SCHEMA = _object_schema(INSIGHT_FIELD_SCHEMAS)
+BATCH_INSIGHTS_SCHEMA = _object_schema({
+    "results": {"type": "array", "items": _object_schema({"id": {"type": "string"}, **INSIGHT_FIELD_SCHEMAS})},
+})
+
+# Matches complete "field": value pairs, so fields can be recovered from a truncated answer.
+_FIELD_PATTERN = re.compile(r'"(%s)"\s*:\s*(-?\d+(?:\.\d+)?|"(?:[^"\\]|\\.)*")' % "|".join(INSIGHT_FIELD_SCHEMAS))
+# Matches objects without nested braces, i.e. the complete entries of a truncated batch answer.
+_ENTRY_PATTERN = re.compile(r"\{[^{}]*\}")
+
+# Chunks read after the closing brace while waiting for Ollama's final chunk, which carries the token counts.
+_TRAILING_CHUNKS = 2
+
+class _JsonObjectEnd:
+    """Follows streamed text and reports where the first top-level JSON object closes."""
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.closed = False
+
+    def feed(self, text: str):
+        """Returns the offset just past the closing brace if it is in text, otherwise None."""
+        for i, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.closed = True
+                    return i + 1
         return None
 
+def _stream_json_object(endpoint: OllamaEndpoint, messages: list, schema: dict, num_predict: int, llm_span: dict) -> str:
+    """
+    Streams a schema-constrained chat answer and stops reading as soon as the
+    JSON object is complete, so the model cannot keep generating after it.
+    Returns the text received, which is truncated if num_predict ran out.
+    """
+    detector = _JsonObjectEnd()
+    content = []
+    trailing = 0
+    stream = endpoint.client.chat(
+        model=endpoint.model,
+        messages=messages,
+        format=schema,
+        # num_ctx is the same on every call, so Ollama never reloads the model for a different context size
+        options={'num_ctx': MODEL_CONTEXT_TOKENS, 'num_predict': num_predict, 'temperature': SCORING_TEMPERATURE},
+        keep_alive=MODEL_KEEP_ALIVE, # Keep the model loaded so the next candidate does not pay for a reload
+        stream=True
+    )
+    try:
+        for part in stream:
+            if part.get('done'):
+                tracer.record_llm_stats(llm_span, part)
+                break
+            text = part['message']['content']
+            if detector.closed:
+                trailing += 1
+                if trailing >= _TRAILING_CHUNKS:
+                    break
+                continue
+            end = detector.feed(text)
+            content.append(text if end is None else text[:end])
+    finally:
+        # Closing the stream drops the connection, which makes Ollama stop generating
+        stream.close()
+    llm_span["stopped_early"] = detector.closed and trailing >= _TRAILING_CHUNKS
+    return "".join(content)
+
+def _parse_partial(text: str) -> dict:
+    """Parses an answer object, or recovers whichever fields are complete if it was cut off."""
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+    fields = {}
+    for field, value in _FIELD_PATTERN.findall(text):
+        try:
+            fields[field] = json.loads(value)
+        except json.JSONDecodeError:
+            continue
+    return fields
+
+def _parse_batch_entries(text: str) -> list:
+    """Returns the entries of a batch answer, keeping the complete ones if it was cut off."""
+    try:
+        parsed = json.loads(text)
+        entries = parsed.get("results", []) if isinstance(parsed, dict) else parsed
+        return entries if isinstance(entries, list) else []
+    except json.JSONDecodeError:
+        pass
+    entries = []
+    for match in _ENTRY_PATTERN.finditer(text):
+        try:
+            entries.append(json.loads(match.group(0)))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+def _missing_fields(insights: dict) -> list:
+    """Returns the answer fields that are absent or invalid: scores must be numbers, the sentence non-empty."""
+    missing = []
+    for field in INSIGHT_FIELD_SCHEMAS:
+        value = insights.get(field)
+        if field == "personalised_sentence":
+            valid = isinstance(value, str) and value.strip() != ""
+        else:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if not valid:
+            missing.append(field)
+    return missing
+
+def _format_insights(insights: dict) -> dict:
+    """Standardizes the model's keys to match our spreadsheet columns."""
+    return {
+        "Personalised Sentence": insights.get("personalised_sentence"),
+        "Relevance Score": insights.get("relevance_score"),
+        "Tenure Score": insights.get("tenure_score"),
+        "Activity Score": insights.get("activity_score")
+    }
+
+def _repair_fields(prefer: OllamaEndpoint, messages: list, partial_answer: str, missing: list, candidate_url: str) -> dict:
+    """
+    Asks the model for just the missing fields, continuing the same
+    conversation, on the same server if it is free so the prompt is reused,
+    so only a few tokens are generated.
+    """
+    repair_messages = messages + [
+        {'role': 'assistant', 'content': partial_answer},
+        {'role': 'user', 'content': f"Your answer was incomplete. Reply with a JSON object containing only: {', '.join(missing)}."},
+    ]
+    with get_llm_pool().lease(prefer) as endpoint:
+        if endpoint is None:
+            return {}
+        with span("llm_repair", model=endpoint.model, endpoint=endpoint.host, candidate=candidate_url, fields=missing) as llm_span:
+            content = _stream_json_object(
+                endpoint, repair_messages, _object_schema({field: INSIGHT_FIELD_SCHEMAS[field] for field in missing}),
+                RESPONSE_TOKENS_PER_CANDIDATE, llm_span)
+    repaired = _parse_partial(content)
+    return {field: repaired[field] for field in missing if field in repaired}
+
 def generate_candidate_insights(candidate_profile: dict, job_description: str):
     """
     Uses the local Llama 3.2 model to generate a personalized outreach sentence
@@ -32,71 +382,209 @@ def generate_candidate_insights(candidate_profile: dict, job_description: str):
     Returns:
         dict: A dictionary containing scores and a sentence, or None if an error occurs.
     """
-    client = get_llm_client()
-    if not client:
-        return None
-
-    # Construct a detailed, structured prompt for the LLM
-    prompt = f"""
-    You are an expert technical sourcer. Your task is to analyze a candidate's profile against a specific job description and generate actionable recruitment insights.
-
-    **Target Job Description:**
-    ---
-    {job_description}
-    ---
+    # A cache hit skips Ollama completely
+    cache = get_insights_cache()
+    cache_key = insights_cache_key(candidate_profile, job_description)
+    if cache:
+        cached_insights = cache.get(cache_key)
+        if cached_insights:
+            print("Using cached insights for this profile.")
+            return cached_insights
+    return _score_single(candidate_profile, job_description, cache, cache_key)
 
+def _score_single(candidate_profile: dict, job_description: str, cache, cache_key: str):
+    """Scores one candidate with its own LLM call and caches the result."""
+    # The job context is in the shared system message; only the candidate goes in the user message
+    messages = _scoring_messages(job_description, f"""
     **Candidate Profile:**
-    - Name: {candidate_profile.get('Name', 'N/A')}
-    - Current Role: {candidate_profile.get('Current Role', 'N/A')}
-    - Location: {candidate_profile.get('Location', 'N/A')}
-    - Core Skills: {candidate_profile.get('Core Skills', 'N/A')}
-    - LinkedIn Summary/Experience: {candidate_profile.get('summary', 'N/A')}
-    - Full Profile Text (for tenure analysis): {candidate_profile.get('full_text', 'N/A')}
+    {_candidate_details(candidate_profile)}
 
-    **Your Task:**
-    Based *only* on the provided profile and job description, perform the following actions and provide the output in a single, valid JSON object:
-    1.  **`relevance_score`**: On a scale of 1 to 10, how well does the candidate's experience (skills, titles, industry) match the job description?
-    2.  **`tenure_score`**: On a scale of 1 to 10, estimate the candidate's readiness to move based on their time in the current role. A higher score (7-10) means they are in a typical window to consider a change (e.g., 1.5 to 4 years). A lower score means they are either too new (<1 year) or too tenured (>5 years).
-    3.  **`activity_score`**: On a scale of 1 to 10, estimate the candidate's job-seeking activity. Look for explicit signals like an "Open to Work" banner or recent relevant posts. If no signals are present, give a neutral score of 3-5.
-    4.  **`personalised_sentence`**: Write a short, compelling, and personalized sentence (max 250 characters) that a recruiter could use. This sentence must directly reference a specific detail from the candidate's profile *in relation to the job*.
-
-    **Output Format (JSON only):**
+    Score this candidate and provide the output in a single, valid JSON object:
     {{
       "relevance_score": <integer>,
       "tenure_score": <integer>,
       "activity_score": <integer>,
       "personalised_sentence": "<string>"
     }}
-    """
+    """)
 
-    try:
-        print(f"Sending request to local model '{MODEL_NAME}' for detailed analysis...")
-        response = client.chat(
-            model=MODEL_NAME,
-            messages=[{'role': 'user', 'content': prompt}],
-            format='json' # Use Ollama's built-in JSON mode for reliable output
-        )
-        
-        # The response content should be a JSON string, so we parse it.
-        insights = json.loads(response['message']['content'])
-        
-        # Standardize the keys to match our spreadsheet columns
-        formatted_insights = {
-            "Personalised Sentence": insights.get("personalised_sentence"),
-            "Relevance Score": insights.get("relevance_score"),
-            "Tenure Score": insights.get("tenure_score"),
-            "Activity Score": insights.get("activity_score")
-        }
+    # A failed server is taken out of the pool, so a retry goes to another one if there is one
+    attempts = min(2, len(get_llm_pool().endpoints))
+    for attempt in range(attempts):
+        try:
+            with get_llm_pool().lease() as endpoint:
+                if endpoint is None:
+                    return None
+                print(f"Sending request to model '{endpoint.model}' at {endpoint.host} for detailed analysis...")
+                with span("llm_call", model=endpoint.model, endpoint=endpoint.host, candidate=candidate_profile.get('LinkedIn'),
+                          batch_size=1) as llm_span:
+                    _record_prompt(llm_span, messages)
+                    content = _stream_json_object(endpoint, messages, INSIGHTS_SCHEMA, RESPONSE_TOKENS_PER_CANDIDATE, llm_span)
+
+            # Parsed after the lease, so a bad answer does not count as a failure of the server
+            insights = _parse_partial(content)
+            missing = _missing_fields(insights)
+            if missing:
+                # Only the missing fields are generated again, not the whole answer
+                print(f"The model's answer is missing {', '.join(missing)}. Asking for those fields only...")
+                insights.update(_repair_fields(endpoint, messages, content, missing, candidate_profile.get('LinkedIn')))
+                missing = _missing_fields(insights)
+
+            if missing:
+                print(f"Error: The model did not provide {', '.join(missing)}. Raw response: {content}")
+                return None
+            formatted_insights = _format_insights(insights)
         
-        print("Successfully received and parsed detailed insights from the model.")
-        return formatted_insights
+            print("Successfully received and parsed detailed insights from the model.")
+            if cache:
+                cache.put(cache_key, formatted_insights)
+            return formatted_insights
 
-    except json.JSONDecodeError as e:
-        print(f"Error: Could not decode JSON from model response. Error: {e}")
-        print(f"Raw response: {{response['message']['content']}}")
-        return None
+        except Exception as e:
+            print(f"An unexpected error occurred while communicating with the LLM: {e}")
+            if attempt + 1 < attempts:
+                print("Retrying on another server...")
+    return None
+
+# --- Batch Scoring ---
+
+def _batch_prompt(candidate_details: list) -> str:
+    """Builds the user message that scores several candidates in one request."""
+    candidates = "\n\n".join(
+        f"    Candidate ID: c{position + 1}\n    {details}" for position, details in enumerate(candidate_details))
+    return f"""
+    **Candidate Profiles:**
+{candidates}
+
+    Score every candidate independently and provide the output in a single, valid JSON object:
+    {{
+      "results": [
+        {{
+          "id": "<candidate id, e.g. c1>",
+          "relevance_score": <integer>,
+          "tenure_score": <integer>,
+          "activity_score": <integer>,
+          "personalised_sentence": "<string>"
+        }}
+      ]
+    }}
+    Return exactly one entry per candidate ID.
+    """
+
+def plan_batches(candidate_details: list, job_description: str) -> list:
+    """
+    Splits candidates (given as their formatted details) into batches of at most
+    MAX_BATCH_SIZE that fit in MODEL_CONTEXT_TOKENS together with the shared job
+    context and the expected answers. Returns lists of positions.
+    """
+    # Token counts are estimated from characters, so a tenth of the window is kept free as a margin
+    shared = estimate_tokens(system_message(job_description)) + estimate_tokens(_batch_prompt([]))
+    budget = int(MODEL_CONTEXT_TOKENS * 0.9) - shared
+    batches, current, used = [], [], 0
+    for position, details in enumerate(candidate_details):
+        cost = estimate_tokens(details) + RESPONSE_TOKENS_PER_CANDIDATE
+        if current and (len(current) >= MAX_BATCH_SIZE or used + cost > budget):
+            batches.append(current)
+            current, used = [], 0
+        current.append(position)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _score_batch(candidate_profiles: list, candidate_details: list, job_description: str) -> dict:
+    """
+    Scores several candidates in one LLM call. Returns {position: insights} for
+    the candidates that came back complete; the rest are simply missing.
+    """
+    messages = _scoring_messages(job_description, _batch_prompt(candidate_details))
+    try:
+        with get_llm_pool().lease() as endpoint:
+            if endpoint is None:
+                return {}
+            print(f"Sending {len(candidate_details)} candidates to model '{endpoint.model}' at {endpoint.host} in one request...")
+            with span("llm_call", model=endpoint.model, endpoint=endpoint.host,
+                      candidate=[p.get('LinkedIn') for p in candidate_profiles],
+                      batch_size=len(candidate_details)) as llm_span:
+                _record_prompt(llm_span, messages)
+                content = _stream_json_object(endpoint, messages, BATCH_INSIGHTS_SCHEMA,
+                                              len(candidate_details) * RESPONSE_TOKENS_PER_CANDIDATE, llm_span)
     except Exception as e:
         print(f"An unexpected error occurred while communicating with the LLM: {e}")
+        return {}
+
+    # A cut-off answer still yields its complete entries; the rest fall back to single scoring
+    entries = _parse_batch_entries(content)
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        candidate_id = str(entry.get("id", "")).strip().lower()
+        if not candidate_id.startswith("c") or not candidate_id[1:].isdigit():
+            continue
+        position = int(candidate_id[1:]) - 1
+        if 0 <= position < len(candidate_details) and position not in results and not _missing_fields(entry):
+            results[position] = _format_insights(entry)
+    return results
+
+def generate_batch_insights(candidate_profiles: list, job_description: str) -> list:
+    """
+    Scores several candidates, sending the job description once per batch
+    instead of once per candidate.
+
+    Cached candidates are not sent again. Any candidate the model leaves out of
+    the batch answer, or returns with missing fields, is scored on its own.
+
+    Returns:
+        list: One insights dict (or None on failure) per profile, in the same order.
+    """
+    results = [None] * len(candidate_profiles)
+    cache = get_insights_cache()
+    cache_keys = [insights_cache_key(profile, job_description) for profile in candidate_profiles]
+    uncached = []
+    for i, cache_key in enumerate(cache_keys):
+        cached_insights = cache.get(cache_key) if cache else None
+        if cached_insights:
+            results[i] = cached_insights
+        else:
+            uncached.append(i)
+    if len(uncached) < len(candidate_profiles):
+        print(f"Using cached insights for {len(candidate_profiles) - len(uncached)} profile(s).")
+
+    details = [_candidate_details(candidate_profiles[i]) for i in uncached]
+    for batch in plan_batches(details, job_description):
+        indices = [uncached[position] for position in batch]
+        batch_results = {}
+        if len(indices) > 1:
+            batch_results = _score_batch([candidate_profiles[i] for i in indices],
+                                         [details[position] for position in batch], job_description)
+        for position, i in enumerate(indices):
+            insights = batch_results.get(position)
+            if insights is None:
+                if len(indices) > 1:
+                    print(f"No usable batch answer for {candidate_profiles[i].get('Name', 'a candidate')}, scoring it on its own.")
+                insights = _score_single(candidate_profiles[i], job_description, cache, cache_keys[i])
+            elif cache:
+                cache.put(cache_keys[i], insights)
+            results[i] = insights
+    return results
+
+def embed_texts(texts: list) -> list:
+    """
+    Embeds a batch of texts with EMBEDDING_MODEL in a single request.
+
+    Returns:
+        list: One embedding vector per input text, or None if an error occurs.
+    """
+    try:
+        with get_llm_pool().lease() as endpoint:
+            if endpoint is None:
+                return None
+            response = endpoint.client.embed(model=EMBEDDING_MODEL, input=texts, keep_alive=MODEL_KEEP_ALIVE)
+        return response['embeddings']
+    except Exception as e:
+        print(f"Error embedding texts with '{EMBEDDING_MODEL}'. Run 'ollama pull {EMBEDDING_MODEL}' if it is missing.")
+        print(f"Underlying error: {e}")
         return None
 
 # --- Example Usage ---
@@ -0,0 +1,186 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+def model_is_available(client, model: str) -> bool:
+    """Checks whether a model has been pulled on the Ollama server behind client."""
+    models = client.list().get('models', [])
+    names = {m.get('model') or m.get('name') for m in models}
+    return model in names or f"{model}:latest" in names
+
+class OllamaEndpoint:
+    """One Ollama server in the pool, with its client, load and latency counters."""
+
+    def __init__(self, host: str, model: str, max_concurrent: int = 1):
+        self.host = host
+        self.model = model
+        self.max_concurrent = max(1, max_concurrent)
+        self.client = None
+        self.reconnect = False # Set on ejection; the connection may be broken, so a new client is made on re-admission
+        self.outstanding = 0
+        self.checked_at = None # When the last health check passed; None until the first one
+        self.ejected_until = 0.0
+        self.failures_in_row = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.latencies = []
+
+class EndpointPool:
+    """
+    Spreads LLM requests over several Ollama servers.
+
+    Each request goes to the available endpoint with the fewest requests in
+    flight, and no endpoint gets more than its max_concurrent at once; callers
+    wait while every endpoint is busy. An endpoint is health-checked (server up,
+    model pulled) before first use and again once the check is older than
+    health_check_ttl. A failed request or check ejects the endpoint for
+    eject_seconds, doubling on each further failure up to max_eject_seconds,
+    after which it must pass a health check to be re-admitted. If every endpoint
+    is ejected, the one due back first is probed instead of failing outright.
+    """
+
+    def __init__(self, endpoints: list, health_check_ttl: float = 300, eject_seconds: float = 30,
+                 max_eject_seconds: float = 600):
+        self.endpoints = endpoints
+        self.health_check_ttl = health_check_ttl
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self._available = threading.Condition()
+
+    @contextmanager
+    def lease(self, prefer: OllamaEndpoint = None):
+        """
+        Reserves an endpoint for the enclosed block and yields it, or None if
+        no endpoint is healthy. The prefer endpoint is taken if it is available
+        and free, e.g. to continue a conversation where its prompt is cached.
+        An exception in the block counts as a failure of the endpoint and is
+        re-raised, so the block should hold only the request itself.
+        """
+        endpoint = self._acquire(prefer)
+        if endpoint is None:
+            yield None
+            return
+        started = time.perf_counter()
+        error = None
+        try:
+            yield endpoint
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(endpoint, time.perf_counter() - started, error)
+
+    def _acquire(self, prefer: OllamaEndpoint = None):
+        checked = set() # Endpoints that failed a health check during this call
+        while True:
+            with self._available:
+                while True:
+                    now = time.monotonic()
+                    admitted = [e for e in self.endpoints if e.ejected_until <= now]
+                    if not admitted:
+                        # Nothing left to wait for; probe the endpoint that is due back first
+                        endpoint = min(self.endpoints, key=lambda e: e.ejected_until)
+                        if endpoint in checked:
+                            return None
+                        endpoint.ejected_until = 0.0
+                        if endpoint.outstanding >= endpoint.max_concurrent:
+                            self._available.wait()
+                            continue
+                        probing_last = True
+                        break
+                    free = [e for e in admitted if e.outstanding < e.max_concurrent]
+                    if free:
+                        # Least outstanding requests; ties go to the endpoint that has served the fewest so far
+                        endpoint = prefer if prefer in free else min(free, key=lambda e: (e.outstanding, e.requests))
+                        probing_last = False
+                        break
+                    self._available.wait()
+                endpoint.outstanding += 1
+                needs_check = endpoint.checked_at is None or now - endpoint.checked_at >= self.health_check_ttl
+
+            # The health check is a network round trip, so it runs outside the lock
+            if not needs_check or self._check(endpoint):
+                return endpoint
+            checked.add(endpoint)
+            with self._available:
+                endpoint.outstanding -= 1
+                self._available.notify_all()
+            if probing_last:
+                return None
+
+    def _check(self, endpoint: OllamaEndpoint) -> bool:
+        """Connects to the endpoint if needed and checks that it answers. Ejects it if not."""
+        try:
+            if endpoint.client is None or endpoint.reconnect:
+                # Imported here so offline tools (e.g. the rerank command) start without loading the Ollama client
+                import ollama
+                endpoint.client = ollama.Client(host=endpoint.host)
+                endpoint.reconnect = False
+            if not model_is_available(endpoint.client, endpoint.model):
+                print(f"Warning: model '{endpoint.model}' was not found on {endpoint.host}. Run 'ollama pull {endpoint.model}'.")
+        except Exception as e:
+            print(f"Error connecting to Ollama at {endpoint.host}.")
+            print("Please ensure the Ollama application is running and the model is available.")
+            print(f"Underlying error: {e}")
+            with self._available:
+                self._eject(endpoint)
+            return False
+        with self._available:
+            if endpoint.ejections and endpoint.checked_at is None:
+                print(f"Ollama endpoint {endpoint.host} passed its health check and is back in the pool.")
+            endpoint.checked_at = time.monotonic()
+        return True
+
+    def _release(self, endpoint: OllamaEndpoint, seconds: float, error: Exception = None):
+        with self._available:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            if error is None:
+                endpoint.failures_in_row = 0
+                endpoint.latencies.append(seconds)
+            else:
+                endpoint.failures += 1
+                self._eject(endpoint)
+                print(f"Ollama endpoint {endpoint.host} failed a request and was taken out of the pool"
+                      f" for {endpoint.ejected_until - time.monotonic():.0f}s.")
+            self._available.notify_all()
+
+    def _eject(self, endpoint: OllamaEndpoint):
+        """Takes an endpoint out of rotation. Call with the lock held."""
+        endpoint.failures_in_row += 1
+        endpoint.ejections += 1
+        endpoint.reconnect = True
+        endpoint.checked_at = None
+        backoff = min(self.max_eject_seconds, self.eject_seconds * 2 ** (endpoint.failures_in_row - 1))
+        endpoint.ejected_until = time.monotonic() + backoff
+
+    def stats(self) -> list:
+        """Returns per-endpoint request, failure and latency counts."""
+        with self._available:
+            rows = []
+            for endpoint in self.endpoints:
+                ordered = sorted(endpoint.latencies)
+                rows.append({
+                    "host": endpoint.host,
+                    "model": endpoint.model,
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                    "ejections": endpoint.ejections,
+                    "mean_seconds": sum(ordered) / len(ordered) if ordered else 0.0,
+                    "p95_seconds": ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)] if ordered else 0.0,
+                    "ejected": endpoint.ejected_until > time.monotonic(),
+                })
+            return rows
+
+    def print_stats(self):
+        """Prints how many requests each endpoint served and how fast."""
+        rows = [row for row in self.stats() if row["requests"] or row["ejections"]]
+        if not rows:
+            return
+        print("\n--- Ollama Endpoints ---")
+        print(f"{'Endpoint':<32}{'requests':>9}{'failed':>8}{'ejected':>9}{'mean (s)':>10}{'p95 (s)':>10}")
+        for row in rows:
+            print(f"{row['host'][:31]:<32}{row['requests']:>9}{row['failures']:>8}{row['ejections']:>9}"
+                  f"{row['mean_seconds']:>10.2f}{row['p95_seconds']:>10.2f}")
@@ -0,0 +1,138 @@
+import re
+
+# Lines at least this long are dropped when they repeat anywhere in the profile. Shorter ones (company names,
+# locations) legitimately repeat across experience entries, so only back-to-back copies of those are dropped.
+MIN_DEDUPE_LENGTH = 40
+
+# Rough size of a llama token in characters of English text, used to turn a token budget into a length.
+CHARS_PER_TOKEN = 4
+
+# Headings after which the page shows other people, not this candidate. Everything from here on is dropped.
+STOP_HEADINGS = (
+    "people also viewed",
+    "people you may know",
+    "you might like",
+    "more profiles for you",
+    "other similar profiles",
+    "explore premium profiles",
+)
+
+# Profile sections we recognise in the main text.
+SECTION_HEADINGS = {
+    "about", "activity", "experience", "education", "skills", "licenses & certifications", "projects",
+    "volunteering", "languages", "recommendations", "interests", "featured", "honors & awards",
+    "publications", "courses", "organizations",
+}
+
+# Sections that are kept in the "other" part of the distilled text; the rest (activity, interests...) is noise for scoring.
+USEFUL_SECTIONS = {"education", "licenses & certifications", "projects", "languages", "honors & awards", "publications", "courses"}
+
+# Button labels and other UI chrome, matched against the whole line (case-insensitive).
+BOILERPLATE_LINES = {
+    "message", "connect", "follow", "following", "more", "see more", "…see more", "see less", "show more",
+    "show less", "show all", "send", "pending", "contact info", "add profile section", "open to", "like",
+    "comment", "repost", "endorse", "view", "home", "my network", "jobs", "messaging", "notifications",
+}
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^show all\b", re.I),
+    re.compile(r"^[\d,]+\+? (followers|connections)\b", re.I),
+    re.compile(r"^·?\s*(1st|2nd|3rd\+?)( degree connection)?$", re.I),
+    re.compile(r"^(endorsed by|\d+ endorsements?)\b", re.I),
+    re.compile(r"^(posts|comments|images|videos|reactions)$", re.I),
+]
+
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+DATE_RANGE = re.compile(rf"(?:{MONTH}\s+)?\d{{4}}\s*[-–]\s*(?:present|(?:{MONTH}\s+)?\d{{4}})", re.I)
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+def _is_boilerplate(line: str) -> bool:
+    lowered = line.lower()
+    return lowered in BOILERPLATE_LINES or any(pattern.search(line) for pattern in BOILERPLATE_PATTERNS)
+
+def _clean_lines(text: str, already_seen: set) -> list:
+    """Splits page text into lines without chrome, people-also-viewed content or repeated lines."""
+    lines = []
+    for raw_line in (text or "").splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            continue
+        key = line.lower()
+        if key in STOP_HEADINGS:
+            break
+        if _is_boilerplate(line) or key in already_seen or (lines and key == lines[-1].lower()):
+            continue
+        if len(line) >= MIN_DEDUPE_LENGTH:
+            already_seen.add(key)
+        lines.append(line)
+    return lines
+
+def _split_sections(lines: list) -> dict:
+    """Groups lines under the section heading they follow. Lines before the first heading go under 'top'."""
+    sections = {"top": []}
+    current = "top"
+    for line in lines:
+        if line.lower() in SECTION_HEADINGS:
+            current = line.lower()
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return sections
+
+def extract_experience(lines: list) -> list:
+    """Turns experience lines into 'title | company | dates' entries, anchored on the date-range lines."""
+    entries = []
+    used = set()
+    for i, line in enumerate(lines):
+        if not DATE_RANGE.search(line):
+            continue
+        previous = [j for j in range(max(0, i - 2), i) if j not in used]
+        parts = [lines[j] for j in previous] + [line]
+        used.update(previous + [i])
+        entries.append(" | ".join(parts))
+    return entries
+
+def _take_within(lines: list, budget_chars: int) -> list:
+    kept = []
+    for line in lines:
+        if budget_chars <= 0:
+            break
+        if len(line) > budget_chars:
+            line = line[:budget_chars].rsplit(" ", 1)[0] + "…"
+        kept.append(line)
+        budget_chars -= len(line) + 1
+    return kept
+
+def distill_profile(candidate_profile: dict, token_budget: int = 600) -> str:
+    """
+    Reduces a scraped profile to the text the LLM needs: experience entries
+    (title, company, date range), the about text, skills and a few other useful
+    sections, without UI chrome or repeated lines, trimmed to token_budget.
+    """
+    # The identity fields are already in the prompt, so their copies in the page text are dropped
+    seen = {str(candidate_profile.get(field, "")).lower() for field in ("Name", "Current Role", "Location")}
+    summary = candidate_profile.get("summary")
+    about_lines = _clean_lines(summary, seen) if summary and summary != "N/A" else []
+    sections = _split_sections(_clean_lines(candidate_profile.get("full_text"), seen))
+    if not about_lines:
+        about_lines = sections.get("about", [])
+
+    experience = extract_experience(sections.get("experience", []))
+    # Scraped skills are listed in the prompt on their own, so only the page's skills section is a fallback
+    skills = "" if candidate_profile.get("Core Skills") else ", ".join(sections.get("skills", []))
+    # Text outside any known heading (e.g. a plain-text profile) is kept too, after the useful sections
+    other = [line for name in sorted(USEFUL_SECTIONS) for line in sections.get(name, [])] + sections["top"]
+
+    # Experience matters most for relevance and tenure, so it gets the budget first
+    budget = token_budget * CHARS_PER_TOKEN
+    parts = []
+    for heading, lines in (("Experience", experience), ("About", about_lines),
+                           ("Skills", [skills] if skills else []), ("Other", other)):
+        kept = _take_within(lines, budget - len(heading) - 2)
+        if not kept:
+            continue
+        block = f"{heading}:\n" + "\n".join(kept)
+        parts.append(block)
+        budget -= len(block) + 1
+    return "\n".join(parts)
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+def content_hash(profile: dict) -> str:
+    """Returns a stable hash of a scraped profile dict."""
+    encoded = json.dumps(profile, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+class ProfileStore:
+    """
+    A local SQLite store of scraped profiles keyed by the cleaned profile URL.
+
+    Each row holds the scraped dict, its content hash, the search-result headline
+    seen when it was fetched and the fetch timestamp, so recurring searches can
+    skip profiles that were scraped recently and have not changed. The depth
+    says whether the skills page was scraped too ("deep") or only the main
+    profile page ("shallow").
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " url TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " headline TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " depth TEXT NOT NULL DEFAULT 'deep')"
+        )
+        # Stores created before tiered scraping only hold deep scrapes
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(profiles)")}
+        if "depth" not in columns:
+            self._conn.execute("ALTER TABLE profiles ADD COLUMN depth TEXT NOT NULL DEFAULT 'deep'")
+        self._conn.commit()
+
+    def get(self, url: str):
+        """Returns the stored row for a URL as a dict, or None if it has never been scraped."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, content_hash, headline, fetched_at, depth FROM profiles WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"data": json.loads(row[0]), "content_hash": row[1], "headline": row[2], "fetched_at": row[3],
+                "depth": row[4]}
+
+    def get_fresh(self, url: str, headline: str, ttl_seconds: float):
+        """
+        Returns the stored profile if it is younger than ttl_seconds and the
+        search-result headline has not changed since it was fetched. Otherwise None.
+        """
+        row = self.get(url)
+        if row is None:
+            return None
+        if time.time() - row["fetched_at"] > ttl_seconds:
+            return None
+        if headline is not None and row["headline"] != headline:
+            return None
+        return row["data"]
+
+    def iter_profiles(self):
+        """Yields (url, profile) for every stored profile."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url, data FROM profiles").fetchall()
+        for url, data in rows:
+            yield url, json.loads(data)
+
+    def put(self, url: str, profile: dict, headline: str = None, depth: str = "deep") -> bool:
+        """Stores a freshly scraped profile. Returns True if its content differs from the stored copy."""
+        new_hash = content_hash(profile)
+        previous = self.get(url)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (url, data, content_hash, headline, fetched_at, depth)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(profile, ensure_ascii=False), new_hash, headline, time.time(), depth),
+            )
+            self._conn.commit()
+        return previous is None or previous["content_hash"] != new_hash
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,48 @@
+import random
+import threading
+import time
+
+class NavigationScheduler:
+    """
+    A token bucket that hands out navigation permits to every page in the run.
+
+    Tokens refill at permits_per_minute up to burst. acquire() blocks until a
+    token is available and then sleeps a random jitter, so page loads are not
+    evenly spaced. The scheduler is shared between threads: while one page
+    waits for a permit, the others keep working.
+    """
+
+    def __init__(self, permits_per_minute: float, burst: int = 1, jitter_seconds: tuple = (1, 3)):
+        self.interval = 60.0 / permits_per_minute
+        self.burst = max(1, burst)
+        self.jitter_seconds = jitter_seconds
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.permits_granted = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) / self.interval)
+        self._last_refill = now
+
+    def acquire(self):
+        """Blocks until the global rate budget allows another navigation."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.permits_granted += 1
+                    break
+                wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+        # Jitter happens outside the lock so it only delays this page
+        low, high = self.jitter_seconds
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+        with self._lock:
+            self.total_wait_seconds += time.monotonic() - started
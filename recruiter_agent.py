@@ -1,28 +1,190 @@
+from __future__ import annotations
+
 import os
+import re
 import time
 import random
-import csv
+import argparse
+import threading
 from urllib.parse import quote
-from playwright.sync_api import sync_playwright, Page, BrowserContext
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from playwright.sync_api import Page, BrowserContext
+
 # Import our custom handlers
-# import google_sheets_handler
 import llm_handler
-from config import SEARCH_JOB_TITLE, MAX_CANDIDATES_TO_FIND, JOB_DESCRIPTION, LEAD_SCORE_WEIGHTS, REQUIRED_KEYWORDS
+from candidate_journal import CandidateJournal, read_journal
+from candidate_ranker import PreRanker, job_terms, keyword_overlap
+from browser_profile import enable_lean_routing, new_tracked_page, print_page_stats, stats_for
+from profile_store import ProfileStore
+from rate_limiter import NavigationScheduler
+from scoring_pipeline import ScoringPipeline
+from scraper_pool import ScraperPool
+from goal_tracker import GoalTracker
+from tracing import span, tracer
+from jobs import configured_jobs
+from config import MAX_CANDIDATES_TO_FIND, LEAD_SCORE_WEIGHTS, REQUIRED_KEYWORDS
+from config import SEARCH_EXTRACTION, SEARCH_PAYLOAD_TIMEOUT_MS
+from config import GOAL_CANDIDATES, GOAL_MIN_LEAD_SCORE, GOAL_MAX_MINUTES, GOAL_MAX_SEARCH_PAGES
+from config import PIPELINED_SCORING, SCORING_WORKERS, SCORING_QUEUE_SIZE, SCORING_BATCH_SIZE
+from config import INCREMENTAL_SCRAPE, PROFILE_STORE_FILE, PROFILE_TTL_DAYS
+from config import SCRAPER_WORKERS, NAVIGATIONS_PER_MINUTE, NAVIGATION_BURST, NAVIGATION_JITTER_SECONDS
+from config import BROWSER_PROFILE
+from config import PRERANK_CANDIDATES, PRERANK_TOP_K, PRERANK_MIN_SIMILARITY
+from config import TIERED_SCRAPING, DEEP_SCRAPE_MIN_OVERLAP
+from config import TRACE_FILE
+from config import GOOGLE_SHEET_ID, GOOGLE_WORKSHEET_NAME, SHEET_BATCH_SIZE, SHEET_FLUSH_SECONDS
 
 # Session Management
 SESSION_FILE = "linkedin_session.json"
+# Every LinkedIn URL is built from this, so the benchmark can point the agent at local fixtures.
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+# Multiplies every human_like_delay. The benchmark sets it to 0 so runs measure work, not sleeps.
+DELAY_SCALE = float(os.getenv("RECRUITER_DELAY_SCALE", "1"))
+
+# --- DOM Extraction Scripts ---
+# Each script runs once per page inside the browser and returns plain data,
+# instead of one Playwright round trip per element and field.
+
+# Returns every search result card with its profile link, headline and result URN.
+SEARCH_RESULTS_JS = """
+() => Array.from(document.querySelectorAll("div.search-results-container li")).map(item => {
+    const link = item.querySelector("a[href*='/in/']");
+    const subtitle = item.querySelector("div.entity-result__primary-subtitle");
+    const urnHolder = item.closest("[data-chameleon-result-urn]") || item.querySelector("[data-chameleon-result-urn]");
+    return {
+        href: link ? link.getAttribute("href") : null,
+        headline: subtitle ? subtitle.innerText : "",
+        urn: urnHolder ? urnHolder.getAttribute("data-chameleon-result-urn") : null
+    };
+})
+"""
+
+# Returns the top card fields, the about text, the skills shown on the main page and the full text of a profile page.
+PROFILE_FIELDS_JS = """
+() => {
+    const text = (selector, root = document) => {
+        const element = root.querySelector(selector);
+        return element ? element.innerText : null;
+    };
+    const about = document.querySelector("section[data-section='about']");
+    // The skills card is found by its anchor, or by its heading on pages without one
+    const anchor = document.querySelector("#skills");
+    const skills = (anchor && anchor.closest("section"))
+        || Array.from(document.querySelectorAll("main section")).find(section => (text("h2", section) || "").trim() === "Skills");
+    const topSkills = skills ? Array.from(skills.querySelectorAll("li")).map(item => {
+        const hidden = item.querySelector("span.visually-hidden");
+        return (hidden ? hidden.innerText : item.innerText).trim();
+    }).filter(Boolean) : [];
+    return {
+        name: text("h1"),
+        current_role: text("div.text-body-medium.break-words"),
+        location: text("span.text-body-small.inline.break-words"),
+        summary: about ? text("div.display-flex.ph5 > div > div > span.visually-hidden", about) : null,
+        top_skills: topSkills,
+        full_text: text("main") || ""
+    };
+}
+"""
+
+# True once the first result link differs from the one seen before clicking "Next".
+NEXT_PAGE_READY_JS = """
+(previousHref) => {
+    const link = document.querySelector("div.search-results-container li a[href*='/in/']");
+    return link !== null && link.getAttribute("href") !== previousHref;
+}
+"""
+
+# One skill name on a /details/skills/ page.
+SKILL_ITEM_SELECTOR = "div.display-flex.ph5.pv3 > div > div > div > div > span.visually-hidden"
+
+# Returns the first `limit` skill names from a /details/skills/ page.
+SKILLS_JS = """
+([selector, limit]) => Array.from(document.querySelectorAll(selector)).slice(0, limit).map(element => element.innerText)
+"""
+
+# --- Search API Payloads ---
+# The search page downloads its results as JSON from LinkedIn's voyager API. Responses whose URL matches this
+# are parsed directly instead of the rendered result cards.
+SEARCH_API_PATTERN = re.compile(r"/voyager/api/(graphql\?.*searchDashClusters|search/)", re.I)
+
+# The result offset in a search API URL, in the GraphQL variables or as a query parameter.
+START_OFFSET_PATTERN = re.compile(r"([(,]start:|[(,]start%3A|[?&]start=)(\d+)", re.I)
+
+# Starts downloading a search API page inside the browser, with the session cookies and CSRF token the page's
+# own requests use, and returns at once. PREFETCHED_SEARCH_PAGE_JS later waits for the parsed JSON (or null).
+PREFETCH_SEARCH_PAGE_JS = """
+(url) => {
+    const csrf = (document.cookie.match(/JSESSIONID="?([^";]+)/) || [])[1];
+    const headers = {"accept": "application/vnd.linkedin.normalized+json+2.1", "x-restli-protocol-version": "2.0.0"};
+    if (csrf) headers["csrf-token"] = csrf;
+    window.__searchPrefetch = window.__searchPrefetch || {};
+    window.__searchPrefetch[url] = fetch(url, {headers, credentials: "include"})
+        .then(response => response.ok ? response.json() : null)
+        .catch(() => null);
+}
+"""
+
+PREFETCHED_SEARCH_PAGE_JS = """
+async (url) => {
+    const pending = (window.__searchPrefetch || {})[url];
+    if (!pending) return null;
+    delete window.__searchPrefetch[url];
+    return await pending;
+}
+"""
+
+# Every page load in the run, on any page, waits for a permit from this scheduler.
+navigation_scheduler = NavigationScheduler(NAVIGATIONS_PER_MINUTE, NAVIGATION_BURST, NAVIGATION_JITTER_SECONDS)
 
 def human_like_delay(min_seconds=2, max_seconds=5):
     """THis FUnction Waits for a random duration to mimic human behavior which makes it difficult to be tracked."""
-    time.sleep(random.uniform(min_seconds, max_seconds))
+    with span("delay"):
+        time.sleep(random.uniform(min_seconds, max_seconds) * DELAY_SCALE)
+
+def navigate(page: Page, url: str, **kwargs):
+    """Waits for a navigation permit from the shared scheduler, then loads the URL."""
+    with span("pacing_wait"):
+        navigation_scheduler.acquire()
+    started = time.monotonic()
+    with span("page_load", url=url):
+        response = page.goto(url, **kwargs)
+    stats = stats_for(page)
+    if stats:
+        stats.record_navigation(time.monotonic() - started)
+    return response
+
+def launches_headless() -> bool:
+    """True if open_browser_context starts a headless browser by default."""
+    # A login may need 2FA in a visible window, so the lean profile only goes headless with a saved session
+    return BROWSER_PROFILE == 'lean' and os.path.exists(SESSION_FILE)
+
+def open_browser_context(p, visible: bool = False):
+    """
+    Launches Chromium and returns (browser, context), loading the saved session
+    if there is one. With visible=True the browser always opens a window.
+    """
+    lean = BROWSER_PROFILE == 'lean'
+    has_session = os.path.exists(SESSION_FILE)
+    browser = p.chromium.launch(headless=launches_headless() and not visible, slow_mo=0 if lean else 50)
+    
+    if has_session:
+        print("Found existing session file. Loading state...")
+        context = browser.new_context(storage_state=SESSION_FILE)
+    else:
+        print("No session file found. A new login will be performed.")
+        context = browser.new_context()
+
+    if lean:
+        enable_lean_routing(context)
+    return browser, context
 
 def login_to_linkedin(context: BrowserContext, page: Page):
     """Handles the login process for LinkedIn."""
     print("Navigating to LinkedIn login page...")
-    page.goto("https://www.linkedin.com/login")
-    human_like_delay()
+    navigate(page, f"{LINKEDIN_BASE_URL}/login")
 
     if not LINKEDIN_EMAIL or not LINKEDIN_PASSWORD:
         raise ValueError("LinkedIn credentials not found in .env file.")
@@ -49,136 +211,373 @@ def login_to_linkedin(context: BrowserContext, page: Page):
         context.storage_state(path=SESSION_FILE)
         print(f"Session state saved to {SESSION_FILE}")
 
-def search_for_candidates(page: Page, job_title: str, max_candidates: int) -> list[str]:
+def search_for_candidates(page: Page, job_title: str, max_candidates: int, required_keywords: list = None) -> list[dict]:
     """
     Searches LinkedIn for candidates, validates them on the search page,
-    handles pagination, and returns a list of relevant profile URLs.
+    handles pagination, and returns the relevant search results as
+    dicts with the profile "url" and the result "headline".
+
+    Results are kept if their headline contains all required_keywords
+    (REQUIRED_KEYWORDS by default). With SEARCH_EXTRACTION = 'network' they are
+    read from the search API responses, otherwise from the result cards.
     """
+    candidates = [candidate for new_candidates in iter_search_pages(page, job_title, max_candidates, required_keywords)
+                  for candidate in new_candidates]
+
+    if not candidates:
+        print("\n--- COULD NOT FIND ANY RELEVANT PROFILE LINKS ---")
+        print("The script could not find any candidates matching the required keywords.")
+        print("This might be due to a change in LinkedIn's page structure or no matching profiles.")
+        return []
+
+    print(f"Successfully extracted {len(candidates)} unique and relevant candidate URLs.")
+    return candidates[:max_candidates]
+
+def iter_search_pages(page: Page, job_title: str, max_candidates: int, required_keywords: list = None,
+                      prefetch: bool = True):
+    """
+    Runs the search and yields the new relevant candidates of each results
+    page as soon as that page has been read, so the caller can work on them
+    before the next page is loaded. Stops after max_candidates in total.
+
+    With prefetch=False the next search API page is only requested once the
+    caller asks for it, for callers that may stop after any page.
+    """
+    if required_keywords is None:
+        required_keywords = REQUIRED_KEYWORDS
     print(f"Starting search for '{job_title}'...")
 
     encoded_job_title = quote(job_title)
-    search_url = f"https://www.linkedin.com/search/results/people/?keywords={encoded_job_title}&origin=GLOBAL_SEARCH_HEADER"
+    search_url = f"{LINKEDIN_BASE_URL}/search/results/people/?keywords={encoded_job_title}&origin=GLOBAL_SEARCH_HEADER"
     print(f"Constructed search URL: {search_url}")
-    page.goto(search_url)
-    human_like_delay()
 
+    # Listen for the results JSON the page downloads while it loads
+    payloads = []
+    def capture_payload(response):
+        if is_search_payload(response):
+            payloads.append(response)
+
+    network = SEARCH_EXTRACTION == 'network'
+    if network:
+        page.on("response", capture_payload)
+    try:
+        navigate(page, search_url)
+        if network and not payloads:
+            try:
+                page.wait_for_event("response", predicate=is_search_payload, timeout=SEARCH_PAYLOAD_TIMEOUT_MS)
+            except Exception:
+                pass
+    finally:
+        if network:
+            page.remove_listener("response", capture_payload)
+
+    first_page = read_first_payload(payloads) if network else None
+    if network and first_page is None:
+        print("No search results found in the search API responses, reading the result cards instead.")
+    if first_page:
+        yield from search_from_payloads(page, first_page, max_candidates, required_keywords, prefetch)
+    else:
+        yield from search_from_result_cards(page, max_candidates, required_keywords)
+
+def add_search_results(results: list, max_candidates: int, required_keywords: list,
+                       candidates: list, candidate_urls: set, processed_ids: set) -> bool:
+    """
+    Adds the results whose headline contains all required keywords to candidates,
+    skipping results seen before. Returns False if every result had been seen.
+    """
+    all_items_processed = True
+    for result in results:
+        # Use a stable profile id to avoid reprocessing the same card
+        profile_id = get_result_profile_id(result)
+        if not profile_id or profile_id in processed_ids:
+            continue
+        
+        all_items_processed = False
+        processed_ids.add(profile_id)
+
+        headline = result["headline"].lower()
+
+        # Check if all required keywords are in the headline
+        if all(keyword.lower() in headline for keyword in required_keywords):
+            href = result["href"]
+            if href:
+                clean_url = href.split('?')[0]
+                if clean_url not in candidate_urls:
+                    print(f"Found relevant candidate: {headline}")
+                    candidate_urls.add(clean_url)
+                    candidates.append({"url": clean_url, "headline": headline, "id": profile_id})
+                    if len(candidates) >= max_candidates:
+                        break
+        else:
+            # This is commented out to avoid cluttering the output
+            # print(f"Skipping candidate, headline does not match: {headline}")
+            pass
+    return not all_items_processed
+
+def search_from_result_cards(page: Page, max_candidates: int, required_keywords: list):
+    """
+    Reads the rendered result cards page by page, clicking "Next" until enough
+    candidates are found. Yields the new candidates of each page.
+    """
     print("Extracting and validating candidate profile URLs...")
-    page.wait_for_selector("div.search-results-container", timeout=15000)
+    page.wait_for_selector("div.search-results-container li", timeout=15000)
 
-    candidate_urls = []
-    processed_items = set() # Keep track of items we've already processed
+    candidates = []
+    candidate_urls = set()
+    processed_ids = set() # Profile ids we've already looked at, across all pages
 
-    while len(candidate_urls) < max_candidates:
-        # Find all list items that could be a search result
-        list_items = page.locator("div.search-results-container li")
+    while len(candidates) < max_candidates:
+        # Pull every result card on the page in a single round trip
+        with span("search_extract"):
+            results = page.evaluate(SEARCH_RESULTS_JS)
         
-        if list_items.count() == 0:
+        if not results:
             print("No search result items found on the page.")
             break
 
-        all_items_processed = True
-        for i in range(list_items.count()):
-            item = list_items.nth(i)
-            
-            # Create a unique identifier for the item to avoid reprocessing
-            item_html = item.inner_html()
-            if item_html in processed_items:
-                continue
-            
-            all_items_processed = False
-            processed_items.add(item_html)
-
-            # Extract the headline/role text from the search result item
-            primary_subtitle_locator = item.locator("div.entity-result__primary-subtitle")
-            headline = primary_subtitle_locator.inner_text().lower() if primary_subtitle_locator.count() > 0 else ""
-
-            # Check if all required keywords are in the headline
-            if all(keyword.lower() in headline for keyword in REQUIRED_KEYWORDS):
-                link_locator = item.locator("a[href*='/in/']").first
-                if link_locator.count() > 0:
-                    href = link_locator.get_attribute("href")
-                    if href:
-                        clean_url = href.split('?')[0]
-                        if clean_url not in candidate_urls:
-                            print(f"Found relevant candidate: {headline}")
-                            candidate_urls.append(clean_url)
-                            if len(candidate_urls) >= max_candidates:
-                                break
-            else:
-                # This is commented out to avoid cluttering the output
-                # print(f"Skipping candidate, headline does not match: {headline}")
-                pass
+        found_before = len(candidates)
+        found_new = add_search_results(results, max_candidates, required_keywords, candidates, candidate_urls, processed_ids)
+        yield candidates[found_before:]
 
-        if len(candidate_urls) >= max_candidates:
+        if len(candidates) >= max_candidates:
             break
 
         # If we've processed all items on the page, try to scroll or go to the next page
-        if all_items_processed:
+        if not found_new:
             print("All items on the current page have been processed.")
         
-        # Scroll down to load more results
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        human_like_delay(2, 4)
-        
-        # Try to click the "Next" button if it exists and is enabled
-        next_button = page.locator("button:has-text('Next')")
-        if next_button.is_visible() and next_button.is_enabled():
-            print("Scrolling finished. Clicking 'Next' page button...")
-            next_button.click()
-            human_like_delay(3, 6)
-            processed_items.clear() # Clear processed items when moving to a new page
-        else:
+        with span("search_pagination"):
+            # Scroll down to load more results, and wait for the pagination bar to render
+            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            next_button = page.locator("button:has-text('Next')")
+            try:
+                next_button.wait_for(state="visible", timeout=5000)
+            except Exception:
+                pass
+            
+            # Try to click the "Next" button if it exists and is enabled
+            has_next_page = next_button.is_visible() and next_button.is_enabled()
+            if has_next_page:
+                print("Scrolling finished. Clicking 'Next' page button...")
+                with span("pacing_wait"):
+                    navigation_scheduler.acquire()
+                next_button.click()
+                # Ready once the first result on the page has changed
+                first_href = next((result["href"] for result in results if result["href"]), None)
+                try:
+                    page.wait_for_function(NEXT_PAGE_READY_JS, arg=first_href, timeout=15000)
+                except Exception:
+                    print("The next page of search results did not load.")
+                    has_next_page = False
+
+        if not has_next_page:
             # If there's no "Next" button, we assume we've reached the end
             print("Reached the end of the search results.")
             break
-            
-    if not candidate_urls:
-        print("\n--- COULD NOT FIND ANY RELEVANT PROFILE LINKS ---")
-        print("The script could not find any candidates matching the required keywords.")
-        print("This might be due to a change in LinkedIn's page structure or no matching profiles.")
-        return []
 
-    print(f"Successfully extracted {len(candidate_urls)} unique and relevant candidate URLs.")
-    return candidate_urls[:max_candidates]
+def read_first_payload(responses: list):
+    """
+    Returns (url, payload, results) for the first captured search API response
+    that holds people results, or None if none of them does.
+    """
+    for response in responses:
+        try:
+            payload = response.json()
+        except Exception:
+            continue
+        results = parse_search_payload(payload)
+        if results:
+            return response.url, payload, results
+    return None
 
+def search_from_payloads(page: Page, first_page: tuple, max_candidates: int, required_keywords: list,
+                         prefetch: bool = True):
+    """
+    Reads the results from the first search API response (see
+    read_first_payload), then fetches the following pages' JSON directly.
+    Yields the new candidates of each page. With prefetch, the next page is
+    requested before the current one is handed over, so it downloads while
+    the caller works.
+    """
+    print("Extracting candidate profile URLs from the search API responses...")
+    url, payload, results = first_page
+    candidates = []
+    candidate_urls = set()
+    processed_ids = set() # Profile ids we've already looked at, across all pages
 
-def scrape_linkedin_profile(page: Page, profile_url: str) -> dict:
-    """Scrapes the essential information from a LinkedIn profile."""
-    print(f"Scraping profile: {profile_url}")
-    page.goto(profile_url, wait_until="domcontentloaded", timeout=60000)
-    human_like_delay(3, 6)
+    while True:
+        next_url = next_search_page_url(url, payload, len(results))
+        # No need for the next page if this one can already fill the list
+        prefetched = prefetch and bool(next_url) and len(candidates) + len(results) < max_candidates
+        if prefetched:
+            prefetch_search_page(page, next_url)
 
-    try:
-        about_section = page.locator("section[data-section='about']")
-        if about_section.locator("button:has-text('See more')").is_visible():
-            about_section.locator("button:has-text('See more')").click()
-            human_like_delay(1,2)
-
-        name = page.locator("h1").first.inner_text()
-        current_role = page.locator("div.text-body-medium.break-words").first.inner_text().strip()
-        location = page.locator("span.text-body-small.inline.break-words").first.inner_text().strip()
-        
-        summary_element = about_section.locator("div.display-flex.ph5 > div > div > span.visually-hidden")
-        summary = summary_element.first.inner_text() if summary_element.count() > 0 else "N/A"
-        full_text = page.locator("main").inner_text()
+        found_before = len(candidates)
+        with span("search_extract", source="network"):
+            found_new = add_search_results(results, max_candidates, required_keywords, candidates, candidate_urls, processed_ids)
+        yield candidates[found_before:]
+
+        if len(candidates) >= max_candidates:
+            break
+        if not found_new:
+            # The API returned a page we have already seen; stop rather than loop
+            print("All items on the current page have been processed.")
+            break
+        if not next_url:
+            print("Reached the end of the search results.")
+            break
+
+        with span("search_pagination", source="network"):
+            if not prefetched:
+                prefetch_search_page(page, next_url)
+            payload = page.evaluate(PREFETCHED_SEARCH_PAGE_JS, next_url)
+        url = next_url
+        results = parse_search_payload(payload) if payload else []
+        if not results:
+            print("Reached the end of the search results." if payload else "Could not load the next page of search results.")
+            break
+
+def prefetch_search_page(page: Page, url: str):
+    """Waits for a navigation permit, then starts downloading a search API page in the browser."""
+    with span("pacing_wait"):
+        navigation_scheduler.acquire()
+    page.evaluate(PREFETCH_SEARCH_PAGE_JS, url)
+
+def is_search_payload(response) -> bool:
+    """True for a successful search API response (the JSON behind the search results page)."""
+    return bool(SEARCH_API_PATTERN.search(response.url)) and response.ok
+
+def parse_search_payload(payload) -> list[dict]:
+    """
+    Finds the people results in a search API payload: every object with a
+    profile navigationUrl and a primarySubtitle, wherever it is nested. Returns
+    them in the same shape as SEARCH_RESULTS_JS (href, headline, urn).
+    """
+    results = []
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            url = node.get("navigationUrl")
+            if isinstance(url, str) and "/in/" in url and "primarySubtitle" in node:
+                subtitle = node.get("primarySubtitle") or {}
+                results.append({
+                    "href": url,
+                    "headline": (subtitle.get("text") if isinstance(subtitle, dict) else subtitle) or "",
+                    # Same URN as the result card's data-chameleon-result-urn, so both paths give the same ids
+                    "urn": node.get("trackingUrn") or node.get("entityUrn"),
+                })
+                return
+            for value in node.values():
+                walk(value)
+    walk(payload)
+    return results
+
+def _find_paging(payload):
+    """
+    Returns the paging object ({"start", "count", "total"}) of a search API
+    payload's result collection. Only the "data" chain is searched (data.paging,
+    data.data.<collection>.paging and so on), never the included entities.
+    """
+    node = payload
+    while isinstance(node, dict):
+        # The paging sits on the level itself or on a collection directly under it
+        for container in [node, *(value for value in node.values() if isinstance(value, dict))]:
+            paging = container.get("paging")
+            if isinstance(paging, dict) and isinstance(paging.get("start"), int) and isinstance(paging.get("count"), int):
+                return paging
+        node = node.get("data")
+    return None
+
+def next_search_page_url(url: str, payload, result_count: int) -> str:
+    """
+    Builds the search API URL of the page after this one by moving its start
+    offset on by the page size. Returns None on the last page.
+    """
+    match = START_OFFSET_PATTERN.search(url)
+    if not match:
+        return None
+    paging = _find_paging(payload) or {}
+    start = paging.get("start", int(match.group(2)))
+    step = paging.get("count") or result_count
+    total = paging.get("total")
+    if not step or (total and start + step >= total):
+        return None
+    return url[:match.start(2)] + str(start + step) + url[match.end(2):]
+
+def search_for_jobs(page: Page, jobs: list, max_candidates: int) -> list[dict]:
+    """
+    Runs the search for every job and merges the results, so a profile found by
+    several searches is scraped only once. Each candidate gets a "jobs" list
+    with the positions of the jobs whose search found it.
+    """
+    merged = {} # Profile URL -> candidate
+    searches = {} # (title, keywords) -> results, so jobs sharing a search only run it once
+    for j, job in enumerate(jobs):
+        if len(jobs) > 1:
+            print(f"\n=== Job {j+1}/{len(jobs)}: {job['name']} ===")
+        search_key = (job["title"], tuple(job["required_keywords"]))
+        if search_key not in searches:
+            searches[search_key] = search_for_candidates(page, job["title"], max_candidates, job["required_keywords"])
+        for candidate in searches[search_key]:
+            merged.setdefault(candidate["url"], {**candidate, "jobs": []})["jobs"].append(j)
 
+    if len(jobs) > 1:
+        found = sum(len(candidate["jobs"]) for candidate in merged.values())
+        print(f"\nThe {len(jobs)} job searches found {found} candidates, {len(merged)} unique profiles to scrape.")
+    return list(merged.values())
+
+def get_result_profile_id(result: dict) -> str:
+    """Returns a stable id for a search result card: its result URN, or else its profile URL."""
+    if result.get("urn"):
+        return result["urn"]
+    if result.get("href"):
+        return result["href"].split('?')[0].rstrip('/')
+    return None
+
+def scrape_profile_skills(page: Page, profile_url: str) -> list:
+    """Reads the top skills from the profile's skills page. This costs a second navigation."""
+    with span("skills_scrape", url=profile_url):
         try:
-            page.goto(profile_url + "/details/skills/", wait_until="domcontentloaded")
-            human_like_delay(3, 5)
-            skills_elements = page.locator("div.display-flex.ph5.pv3 > div > div > div > div > span.visually-hidden")
-            skills = [skills_elements.nth(i).inner_text() for i in range(min(5, skills_elements.count()))]
+            navigate(page, profile_url + "/details/skills/", wait_until="domcontentloaded")
         except Exception:
             print("Could not navigate to skills page, skipping skills.")
-            skills = []
+            return []
+        try:
+            page.wait_for_selector(SKILL_ITEM_SELECTOR, timeout=10000)
+        except Exception:
+            print("No skills listed on the skills page.")
+        return page.evaluate(SKILLS_JS, [SKILL_ITEM_SELECTOR, 5])
+
+def scrape_linkedin_profile(page: Page, profile_url: str, include_skills: bool = True) -> dict:
+    """
+    Scrapes the essential information from a LinkedIn profile. With
+    include_skills=False only the main profile page is visited and Core Skills
+    holds the top skills that page shows instead of the full skills list.
+    """
+    print(f"Scraping profile: {profile_url}")
+    navigate(page, profile_url, wait_until="domcontentloaded", timeout=60000)
+
+    try:
+        page.wait_for_selector("div.text-body-medium.break-words", timeout=15000)
+        # All profile fields in one round trip. The about text is read from the
+        # visually-hidden span, which holds the full text without clicking "See more".
+        fields = page.evaluate(PROFILE_FIELDS_JS)
+        missing = [key for key in ("name", "current_role", "location") if fields[key] is None]
+        if missing:
+            raise ValueError(f"Could not find {', '.join(missing)} on the profile page.")
+
+        skills = scrape_profile_skills(page, profile_url) if include_skills else fields["top_skills"]
 
         profile_data = {
             "LinkedIn": profile_url,
-            "Name": name,
-            "Current Role": current_role,
-            "Location": location,
+            "Name": fields["name"],
+            "Current Role": fields["current_role"].strip(),
+            "Location": fields["location"].strip(),
             "Core Skills": ", ".join(skills),
-            "summary": summary,
-            "full_text": full_text
+            "summary": fields["summary"] or "N/A",
+            "full_text": fields["full_text"]
         }
         print("Successfully scraped basic profile data.")
         return profile_data
@@ -188,99 +587,517 @@ def scrape_linkedin_profile(page: Page, profile_url: str) -> dict:
         print(f"Error: {e}")
         return None
 
-def calculate_lead_score(scores: dict) -> float:
+def get_candidate_profile(page: Page, profile_store: ProfileStore, candidate: dict, needs_skills=None):
+    """
+    Returns the profile for a search result and whether a page was visited.
+
+    In incremental mode a stored profile is reused while it is younger than
+    PROFILE_TTL_DAYS and its search-result headline has not changed.
+
+    With needs_skills (tiered scraping), the main page is scraped first and the
+    skills page is only visited if needs_skills(profile) is true. A stored
+    shallow profile that now qualifies only gets its skills page scraped.
+    """
+    url = candidate["url"]
+    tiered = needs_skills is not None
+    if profile_store:
+        stored_profile = profile_store.get_fresh(url, candidate["headline"], PROFILE_TTL_DAYS * 24 * 3600)
+        if stored_profile:
+            if profile_store.get(url)["depth"] == "deep" or (tiered and not needs_skills(stored_profile)):
+                print("Using stored profile (scraped recently and the headline has not changed).")
+                return stored_profile, False
+            print("Using the stored main profile page; scraping the skills page it is still missing.")
+            with span("profile_scrape", url=url, depth="deep"):
+                scraped_data = {**stored_profile, "Core Skills": ", ".join(scrape_profile_skills(page, url))}
+            profile_store.put(url, scraped_data, candidate["headline"], "deep")
+            return scraped_data, True
+
+    with span("profile_scrape", url=url) as scrape_span:
+        scraped_data = scrape_linkedin_profile(page, url, include_skills=not tiered)
+        depth = "shallow" if tiered else "deep"
+        if scraped_data and tiered:
+            if needs_skills(scraped_data):
+                scraped_data["Core Skills"] = ", ".join(scrape_profile_skills(page, url))
+                depth = "deep"
+            else:
+                print("The main profile page does not look relevant enough, skipping the skills page.")
+        scrape_span["depth"] = depth
+    if scraped_data and profile_store:
+        if not profile_store.put(url, scraped_data, candidate["headline"], depth):
+            print("Profile content has not changed since the last scrape.")
+    return scraped_data, True
+
+def calculate_lead_score(scores: dict, weights: dict = LEAD_SCORE_WEIGHTS) -> float:
     """Calculates the final lead score based on weighted inputs."""
     relevance = scores.get("Relevance Score", 0) or 0
     tenure = scores.get("Tenure Score", 0) or 0
     activity = scores.get("Activity Score", 0) or 0
     
-    w = LEAD_SCORE_WEIGHTS
+    w = weights
     lead_score = (relevance * w['relevance']) + (tenure * w['tenure']) + (activity * w['activity'])
     return round(lead_score, 2)
 
-def run_agent():
-    """Main function to run the recruitment agent."""
-    all_candidates_data = [] # To store data for CSV export
+def build_candidate_record(scraped_data: dict, llm_insights: dict, weights: dict = LEAD_SCORE_WEIGHTS) -> dict:
+    """Combines a scraped profile with its LLM insights and lead score into the final candidate record."""
+    lead_score = calculate_lead_score(llm_insights, weights)
+    llm_insights = {**llm_insights, "Lead Score": lead_score}
+    print(f"Calculated final Lead Score for {scraped_data.get('Name', 'candidate')}: {lead_score}")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=50)
-        
-        if os.path.exists(SESSION_FILE):
-            print("Found existing session file. Loading state...")
-            context = browser.new_context(storage_state=SESSION_FILE)
-        else:
-            print("No session file found. A new login will be performed.")
-            context = browser.new_context()
+    final_candidate_record = {**scraped_data, **llm_insights}
+    del final_candidate_record['summary']
+    del final_candidate_record['full_text']
+
+    return final_candidate_record
 
-        page = context.new_page()
+def score_candidate(scraped_data: dict, job: dict) -> dict:
+    """Scores a scraped profile against a job with the LLM and returns the final candidate record, or None on failure."""
+    llm_insights = llm_handler.generate_candidate_insights(scraped_data, job["description"])
+    if not llm_insights:
+        return None
+    return build_candidate_record(scraped_data, llm_insights, job["weights"])
+
+def score_candidates(scraped_profiles: list, job: dict) -> list:
+    """Scores several scraped profiles against a job with batched LLM calls. Returns one record (or None) per profile."""
+    all_insights = llm_handler.generate_batch_insights(scraped_profiles, job["description"])
+    return [
+        build_candidate_record(scraped_data, llm_insights, job["weights"]) if llm_insights else None
+        for scraped_data, llm_insights in zip(scraped_profiles, all_insights)
+    ]
 
-        page.goto("https://www.linkedin.com/feed/", timeout=90000)
-        if "login" in page.url or "checkpoint" in page.url:
-            print("Session is invalid or expired. Logging in again.")
+def open_logged_in_page(p):
+    """
+    Opens the browser and checks the saved session on the feed, logging in
+    again if it is missing or expired. Returns (context, page).
+    """
+    browser, context = open_browser_context(p)
+    page = new_tracked_page(context, "main")
+
+    navigate(page, f"{LINKEDIN_BASE_URL}/feed/", timeout=90000)
+    if "login" in page.url or "checkpoint" in page.url:
+        print("Session is invalid or expired. Logging in again.")
+        if launches_headless():
+            # The login may need 2FA or a security check, which needs a window to complete in
+            print("Reopening the browser in a visible window for the login...")
+            browser.close()
+            browser, context = open_browser_context(p, visible=True)
+            page = new_tracked_page(context, "main")
+        with span("login"):
             login_to_linkedin(context, page)
+    else:
+        print("Session loaded successfully. Already logged in.")
+    return context, page
+
+class AgentRun:
+    """
+    The scraping and scoring part of one run_agent call, after the search.
+
+    Holds the run's output (journals, Sheets writers), the profile store, the
+    optional scoring pipeline, pre-rankers and goal tracker, and the counters
+    the end-of-run summary prints. process_candidate and the scoring methods
+    are called from several scraper and scoring threads, so the counters and
+    collections they share are only changed under the run's lock.
+    """
+
+    def __init__(self, jobs: list, candidates: list, resume: bool = False, goal: GoalTracker = None):
+        """
+        Args:
+            jobs (list): The jobs from configured_jobs().
+            candidates (list): The merged search results, each with a "jobs" list. In
+                               goal mode this starts empty and is filled as the search goes.
+            resume (bool): Keep the existing output and skip candidates already in it.
+            goal (GoalTracker): Set in goal mode.
+        """
+        self.jobs = jobs
+        self.job_index = {job["name"]: j for j, job in enumerate(jobs)}
+        self.candidates = candidates
+        self.resume = resume
+        self.goal = goal
+        self.journals = [CandidateJournal(job["journal_file"], job["output_file"], resume=resume) for job in jobs]
+        self.sheet_writers = self._open_sheet_writers()
+        self.profile_store = ProfileStore(PROFILE_STORE_FILE) if INCREMENTAL_SCRAPE else None
+        self.scored_records = {} # Scoring key -> record, used when scoring inline
+        self.awaiting_prerank = {} # Candidate index -> scraped profile, held back for pre-ranking
+        self.pages_skipped = 0
+        self.deep_scrapes = 0
+        self._lock = threading.Lock()
+
+        if resume:
+            self._skip_completed()
+
+        # With pre-ranking, scraped profiles are held back and only the best ones are scored for each job.
+        self.rankers = None
+        if PRERANK_CANDIDATES and goal:
+            print("Embedding pre-ranking needs every candidate up front, so it is not used in goal mode.")
+        elif PRERANK_CANDIDATES:
+            try:
+                self.rankers = [PreRanker(job["description"]) for job in jobs]
+                print("Embedding pre-ranking enabled.")
+            except Exception as e:
+                print(f"Could not set up embedding pre-ranking, every candidate will be scored. Error: {e}")
+
+        # With tiered scraping, the skills page is only visited for profiles that look relevant to one of their jobs
+        self.terms_by_job = [job_terms(job["description"]) for job in jobs] if TIERED_SCRAPING else None
+
+        # In pipelined mode the LLM scores on background threads while the pages keep scraping.
+        self.pipeline = None
+        if PIPELINED_SCORING:
+            print(f"Pipelined scoring enabled with {SCORING_WORKERS} worker(s), up to {SCORING_BATCH_SIZE} candidate(s) per LLM request.")
+            self.pipeline = ScoringPipeline(self.score_and_record_batch, SCORING_WORKERS, SCORING_QUEUE_SIZE, SCORING_BATCH_SIZE)
+
+    def _open_sheet_writers(self) -> list:
+        if not GOOGLE_SHEET_ID:
+            return [None] * len(self.jobs)
+        # Imported here so runs without Google Sheets do not need its dependencies
+        import google_sheets_handler
+        # With several jobs, each one gets its own worksheet
+        return [
+            google_sheets_handler.SheetWriter(
+                GOOGLE_SHEET_ID, GOOGLE_WORKSHEET_NAME if len(self.jobs) == 1 else f"{GOOGLE_WORKSHEET_NAME} - {job['name']}",
+                SHEET_BATCH_SIZE, SHEET_FLUSH_SECONDS)
+            for job in self.jobs
+        ]
+
+    def _skip_completed(self):
+        if self.goal:
+            # Candidates scored in earlier runs count towards the goal
+            for job in self.jobs:
+                for previous_record in read_journal(job["journal_file"]):
+                    self.goal.add(job["name"], previous_record)
+            return
+        for candidate in self.candidates:
+            candidate["jobs"] = [j for j in candidate["jobs"] if candidate["url"] not in self.journals[j].completed_urls]
+        remaining = [c for c in self.candidates if c["jobs"]]
+        print(f"Resuming: {len(self.candidates) - len(remaining)} candidate(s) already done, {len(remaining)} left.")
+        self.candidates = remaining
+
+    # --- Scraping ---
+
+    def scrape(self, page: Page, context: BrowserContext):
+        """
+        Scrapes every candidate, or in goal mode every candidate the search
+        yields until the goal or budget is reached, on page or on
+        SCRAPER_WORKERS parallel pages.
+        """
+        # Searches on its own page, so the results page stays open while profiles are scraped on the others
+        source = self.goal_candidates(new_tracked_page(context, "search")) if self.goal else self.candidates
+        if SCRAPER_WORKERS > 1:
+            # Each worker gets its own browser and context with the saved session
+            print(f"Scraping with {SCRAPER_WORKERS} parallel browser pages.")
+            pool = ScraperPool(
+                SCRAPER_WORKERS,
+                lambda worker_p: new_tracked_page(open_browser_context(worker_p)[1], threading.current_thread().name),
+                self.process_candidate,
+            )
+            pool.run(source)
         else:
-            print("Session loaded successfully. Already logged in.")
+            for i, candidate in enumerate(source):
+                self.process_candidate(page, i, candidate)
 
-        candidate_urls = search_for_candidates(page, SEARCH_JOB_TITLE, MAX_CANDIDATES_TO_FIND)
-        
-        if not candidate_urls:
-            print("No candidates found. Exiting.")
+        if self.profile_store:
+            print(f"\nReused {self.pages_skipped} stored profile(s) instead of re-scraping them.")
+            self.profile_store.close()
+        if self.terms_by_job:
+            print(f"Tiered scraping: {self.deep_scrapes} profile(s) looked relevant enough for the skills page.")
+
+    def goal_candidates(self, search_page: Page):
+        """
+        Reads each job's search one page at a time and yields its candidates
+        while the job still wants more, stopping once the goal is met or the
+        time or search page budget runs out.
+        """
+        goal = self.goal
+        for j, job in enumerate(self.jobs):
+            name = job["name"]
+            if len(self.jobs) > 1:
+                print(f"\n=== Job {j+1}/{len(self.jobs)}: {name} ===")
+            if goal.job_met(name):
+                print(f"The goal for '{name}' is already met by earlier runs, skipping its search.")
+                continue
+            # Without prefetching, a job that meets its goal does not download a page it will never read
+            pages = iter_search_pages(search_page, job["title"], MAX_CANDIDATES_TO_FIND, job["required_keywords"],
+                                      prefetch=False)
+            for new_candidates in pages:
+                goal.count(name, "search_pages")
+                goal.count(name, "found", len(new_candidates))
+                for k, candidate in enumerate(new_candidates):
+                    if not goal.wants(name):
+                        goal.count(name, "skipped_scrapes", len(new_candidates) - k)
+                        break
+                    if self.resume and candidate["url"] in self.journals[j].completed_urls:
+                        continue
+                    candidate = {**candidate, "jobs": [j]}
+                    self.candidates.append(candidate)
+                    yield candidate
+                if goal.out_of_time():
+                    goal.stop_reason = "the time budget ran out"
+                elif goal.out_of_search_pages():
+                    goal.stop_reason = "the search page budget ran out"
+                if goal.stop_reason or goal.job_met(name):
+                    break
+            else:
+                goal.search_exhausted(name)
+            pages.close()
+            if goal.stop_reason:
+                print(f"\nGoal mode: {goal.stop_reason}, no more search pages will be read.")
+                return
+
+    def process_candidate(self, page: Page, i: int, candidate: dict):
+        """Scrapes one candidate and submits the profile for scoring, or holds it back for pre-ranking."""
+        url = candidate["url"]
+        # In goal mode the total is not known until the search stops
+        print(f"\n--- Processing Candidate {i+1}{'' if self.goal else f'/{len(self.candidates)}'}: {url} ---")
+        if self.goal:
+            wanted = [j for j in candidate["jobs"] if self.goal.wants(self.jobs[j]["name"])]
+            for j in set(candidate["jobs"]) - set(wanted):
+                self.goal.count(self.jobs[j]["name"], "skipped_scrapes")
+            if not wanted:
+                print("The goal for this candidate's job has been reached, skipping.")
+                return
+            candidate = {**candidate, "jobs": wanted}
+
+        try:
+            scraped_data, visited = get_candidate_profile(page, self.profile_store, candidate, self.skills_check(candidate))
+            if not visited:
+                with self._lock:
+                    self.pages_skipped += 1
+            if not scraped_data:
+                return
+            if self.goal:
+                for j in candidate["jobs"]:
+                    self.goal.count(self.jobs[j]["name"], "scraped")
+
+            if self.rankers:
+                with self._lock:
+                    self.awaiting_prerank[i] = scraped_data
+            else:
+                for j in candidate["jobs"]:
+                    self.submit_for_scoring(self.scoring_key(i, j), self.for_job(scraped_data, j))
+        except Exception as e:
+            print(f"An error occurred while processing {url}. Skipping.")
+            print(f"Error: {e}")
+
+    def skills_check(self, candidate: dict):
+        """
+        Returns the needs_skills callback for get_candidate_profile: true if the
+        main page overlaps enough with one of the candidate's jobs. None without
+        tiered scraping.
+        """
+        if not self.terms_by_job:
+            return None
+        def needs_skills(profile):
+            overlap = max(keyword_overlap(profile, self.terms_by_job[j]) for j in candidate["jobs"])
+            if overlap < DEEP_SCRAPE_MIN_OVERLAP:
+                return False
+            with self._lock:
+                self.deep_scrapes += 1
+            return True
+        return needs_skills
+
+    # --- Scoring ---
+
+    def scoring_key(self, i: int, j: int) -> int:
+        # Orders results by candidate, then job
+        return i * len(self.jobs) + j
+
+    def for_job(self, scraped_data: dict, j: int) -> dict:
+        # The job travels with the profile through the pipeline and ends up in the record
+        return {**scraped_data, "Job": self.jobs[j]["name"]}
+
+    def submit_for_scoring(self, key: int, job_profile: dict):
+        """Queues a profile on the scoring pipeline, or scores it straight away without one."""
+        if self.pipeline:
+            # Blocks while the queue is full so the browser does not run too far ahead of the model
+            self.pipeline.submit(key, job_profile)
+            print(f"Queued for scoring ({self.pipeline.pending()} waiting).")
+        else:
+            self._score_inline([(key, job_profile)])
+
+    def _score_inline(self, keyed_profiles: list):
+        records = self.score_and_record_batch([job_profile for _, job_profile in keyed_profiles])
+        with self._lock:
+            for (key, _), final_candidate_record in zip(keyed_profiles, records):
+                if final_candidate_record:
+                    self.scored_records[key] = final_candidate_record
+
+    def score_and_record_batch(self, scraped_profiles: list) -> list:
+        """
+        Scores profiles (each tagged with its "Job") and records every scored
+        candidate. Returns one record, or None, per profile.
+        """
+        # A batch can hold profiles for different jobs; each job's profiles are scored together
+        final_candidate_records = [None] * len(scraped_profiles)
+        positions_by_job = {}
+        for position, scraped_data in enumerate(scraped_profiles):
+            if self.goal and not self.goal.wants(scraped_data["Job"]):
+                # The job's goal was reached (or time ran out) while this profile waited for the LLM
+                self.goal.count(scraped_data["Job"], "skipped_scorings")
+                continue
+            positions_by_job.setdefault(scraped_data["Job"], []).append(position)
+        for name, positions in positions_by_job.items():
+            job = self.jobs[self.job_index[name]]
+            if self.goal:
+                self.goal.count(name, "scored", len(positions))
+            if len(positions) == 1:
+                records = [score_candidate(scraped_profiles[positions[0]], job)]
+            else:
+                records = score_candidates([scraped_profiles[position] for position in positions], job)
+            for position, final_candidate_record in zip(positions, records):
+                if final_candidate_record:
+                    self.record(final_candidate_record)
+                final_candidate_records[position] = final_candidate_record
+        return final_candidate_records
+
+    def record(self, final_candidate_record: dict):
+        """Writes a scored candidate to its job's journal, CSV and worksheet, and counts it towards the goal."""
+        j = self.job_index[final_candidate_record["Job"]]
+        with span("output_write", url=final_candidate_record.get("LinkedIn")):
+            self.journals[j].append(final_candidate_record)
+            if self.sheet_writers[j]:
+                try:
+                    self.sheet_writers[j].add(final_candidate_record)
+                except Exception as e:
+                    # The row stays buffered and is retried on a later add or the final flush
+                    print(f"Could not write to Google Sheets yet: {e}")
+        if self.goal and self.goal.add(final_candidate_record["Job"], final_candidate_record):
+            print(f"Goal reached for '{final_candidate_record['Job']}': {GOAL_CANDIDATES} candidate(s) with a lead score"
+                  f" of at least {GOAL_MIN_LEAD_SCORE}.")
+
+    def score_preranked(self):
+        """Pre-ranks the held-back profiles for each job and scores the ones that are kept."""
+        if not self.rankers or not self.awaiting_prerank:
             return
+        selected = [] # (scoring key, profile for the job)
+        for j, job in enumerate(self.jobs):
+            indices = [i for i in sorted(self.awaiting_prerank) if j in self.candidates[i]["jobs"]]
+            if not indices:
+                continue
+            try:
+                kept = [indices[k] for k in self.rankers[j].select(
+                    [self.awaiting_prerank[i] for i in indices], PRERANK_TOP_K, PRERANK_MIN_SIMILARITY)]
+            except Exception as e:
+                print(f"Pre-ranking failed, every candidate will be scored. Error: {e}")
+                kept = indices
+            print(f"\nPre-ranking kept {len(kept)} of {len(indices)} candidates for LLM scoring"
+                  f"{'' if len(self.jobs) == 1 else ' for ' + job['name']}.")
+            selected += [(self.scoring_key(i, j), self.for_job(self.awaiting_prerank[i], j)) for i in kept]
+        selected.sort(key=lambda item: item[0])
+        if self.pipeline:
+            for key, job_profile in selected:
+                self.submit_for_scoring(key, job_profile)
+        else:
+            # All selected profiles are known up front, so they are scored in batches right away
+            for start in range(0, len(selected), SCORING_BATCH_SIZE):
+                self._score_inline(selected[start:start + SCORING_BATCH_SIZE])
 
-        for i, url in enumerate(candidate_urls):
-            print(f"\n--- Processing Candidate {i+1}/{len(candidate_urls)}: {url} ---")
-            
+    # --- Output ---
+
+    def finish(self) -> list:
+        """
+        Waits for the scoring pipeline, closes the journals and flushes the
+        worksheets. Returns the records scored in this run, in candidate order.
+        """
+        if self.pipeline:
+            print("\nScraping finished. Waiting for the remaining candidates to be scored...")
+            all_candidates_data = self.pipeline.close()
+        else:
+            all_candidates_data = [self.scored_records[key] for key in sorted(self.scored_records)]
+
+        for journal in self.journals:
+            journal.close()
+        for sheet_writer in filter(None, self.sheet_writers):
             try:
-                scraped_data = scrape_linkedin_profile(page, url)
-                if not scraped_data:
-                    continue
-
-                llm_insights = llm_handler.generate_candidate_insights(scraped_data, JOB_DESCRIPTION)
-                if not llm_insights:
-                    continue
-                
-                lead_score = calculate_lead_score(llm_insights)
-                llm_insights["Lead Score"] = lead_score
-                print(f"Calculated final Lead Score: {lead_score}")
-
-                final_candidate_record = {**scraped_data, **llm_insights}
-                del final_candidate_record['summary'] 
-                del final_candidate_record['full_text']
-                
-                # --- Store data for CSV export ---
-                all_candidates_data.append(final_candidate_record)
-                
-                # --- The original Google Sheets logic is preserved below ---
-                # google_sheets_handler.add_candidate_to_sheet(
-                #     sheet_id=SHEET_ID,
-                #     worksheet_name=WORKSHEET_NAME,
-                #     candidate_data=final_candidate_record
-                # )
-                
-                human_like_delay(5, 10)
+                sheet_writer.close()
+                print(f"Wrote {sheet_writer.rows_written} row(s) to Google Sheets worksheet '{sheet_writer.worksheet_name}'.")
             except Exception as e:
-                print(f"An error occurred while processing {url}. Skipping.")
-                print(f"Error: {e}")
-                continue
+                print(f"Error writing the remaining rows to Google Sheets: {e}")
+        if all_candidates_data:
+            print()
+            for job in self.jobs:
+                saved = sum(1 for record in all_candidates_data if record["Job"] == job["name"])
+                print(f"Saved {saved} candidates for '{job['name']}' to {job['output_file']} (journal: {job['journal_file']}).")
+        else:
+            print("\nNo new candidate data was collected in this run.")
+        return all_candidates_data
 
-    # --- Write all collected data to a CSV file ---
-    if all_candidates_data:
-        output_filename = "recruited_candidates.csv"
-        print(f"\nWriting {len(all_candidates_data)} candidates to {output_filename}...")
-        
-        # Get the headers from the first record
-        headers = all_candidates_data[0].keys()
-        
-        with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(all_candidates_data)
-            
-        print(f"Successfully saved candidates to {output_filename}")
-    else:
-        print("\nNo candidate data was collected to write to CSV.")
+def run_agent(resume: bool = False):
+    """
+    Main function to run the recruitment agent.
+
+    Every job in configured_jobs() is searched in the same browser session.
+    Each profile is scraped once and scored against the jobs whose search
+    found it. Every scored candidate is written to its job's journal and CSV
+    straight away. With resume=True the existing output is kept and
+    candidates already in a job's journal are not scored for that job again.
+
+    In goal mode (GOAL_CANDIDATES set) search pages are read one at a time
+    while candidates are scraped and scored, and the run stops once every job
+    has enough candidates above GOAL_MIN_LEAD_SCORE or the budget runs out.
+    """
+    # Imported here so the offline rerank command starts without loading Playwright
+    from playwright.sync_api import sync_playwright
+
+    tracer.start(TRACE_FILE)
+    jobs = configured_jobs()
+
+    with sync_playwright() as p:
+        context, page = open_logged_in_page(p)
+
+        goal = None
+        if GOAL_CANDIDATES:
+            goal = GoalTracker([job["name"] for job in jobs], GOAL_CANDIDATES, GOAL_MIN_LEAD_SCORE,
+                               GOAL_MAX_MINUTES, GOAL_MAX_SEARCH_PAGES)
+            print(f"Goal mode: looking for {GOAL_CANDIDATES} candidate(s) per job with a lead score of at least"
+                  f" {GOAL_MIN_LEAD_SCORE}. Search pages are read as the run goes.")
+            candidates = [] # Filled page by page as the search goes
+        else:
+            with span("search"):
+                candidates = search_for_jobs(page, jobs, MAX_CANDIDATES_TO_FIND)
+
+            if not candidates:
+                print("No candidates found. Exiting.")
+                return
+
+        run = AgentRun(jobs, candidates, resume, goal)
+        run.scrape(page, context)
+        run.score_preranked()
+
+        print(f"Navigation scheduler granted {navigation_scheduler.permits_granted} permit(s), "
+              f"waiting {navigation_scheduler.total_wait_seconds:.0f}s in total across all pages.")
+        print_page_stats()
+
+    run.finish()
+
+    cache = llm_handler.get_insights_cache()
+    if cache:
+        stats = cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries stored.")
+    llm_handler.get_llm_pool().print_stats()
+
+    if goal:
+        goal.print_report(MAX_CANDIDATES_TO_FIND, SCORING_BATCH_SIZE if PIPELINED_SCORING else 1)
+
+    tracer.print_summary()
+    tracer.close()
+    if TRACE_FILE:
+        print(f"Span trace written to {TRACE_FILE}.")
 
     print("\n--- Agent has finished processing all candidates. ---")
 
 if __name__ == "__main__":
-    run_agent()
+    parser = argparse.ArgumentParser(description="Source, scrape and score LinkedIn candidates.")
+    parser.add_argument("--resume", action="store_true",
+                        help="keep the existing output and skip candidates already in the journal")
+    subcommands = parser.add_subparsers(dest="command")
+    rerank_parser = subcommands.add_parser(
+        "rerank", help="recompute lead scores for stored candidates with the current config, without the browser or LLM")
+    rerank_parser.add_argument("--journal", action="append",
+                               help="read scored candidates from this journal instead of the profile store (repeatable)")
+    rerank_parser.add_argument("--output", help="where to write the sorted CSV (single-job runs only; "
+                                                "with JOBS every job gets its own reranked_<name>.csv)")
+    args = parser.parse_args()
+
+    if args.command == "rerank":
+        from rerank import run_rerank
+        run_rerank(args.output, args.journal)
+    else:
+        run_agent(resume=args.resume)
@@ -0,0 +1,104 @@
+import csv
+import os
+import time
+
+import numpy as np
+
+import llm_handler
+from candidate_journal import OUTPUT_FIELDS, read_journal
+from jobs import configured_jobs
+from profile_store import ProfileStore
+from config import JOB_DESCRIPTION, LEAD_SCORE_WEIGHTS, REQUIRED_KEYWORDS, PROFILE_STORE_FILE
+
+# The sub-scores the LLM produces, in the same order as the weight vector below.
+SUB_SCORE_FIELDS = ("Relevance Score", "Tenure Score", "Activity Score")
+WEIGHT_KEYS = ("relevance", "tenure", "activity")
+
+def load_from_store(job_description: str = JOB_DESCRIPTION) -> list:
+    """
+    Loads every stored profile and looks up its sub-scores for the job
+    description in the LLM cache. Profiles that were never scored are skipped.
+    """
+    if not os.path.exists(PROFILE_STORE_FILE):
+        print(f"No profile store found at {PROFILE_STORE_FILE}.")
+        return []
+    cache = llm_handler.get_insights_cache()
+    if not cache:
+        print("The LLM cache is disabled, so stored profiles have no sub-scores to rerank.")
+        return []
+
+    store = ProfileStore(PROFILE_STORE_FILE)
+    records = []
+    for url, profile in store.iter_profiles():
+        insights = cache.get(llm_handler.insights_cache_key(profile, job_description))
+        if insights:
+            records.append({**profile, **insights})
+    store.close()
+    return records
+
+def load_from_journals(journal_paths: list, job_name: str = None) -> list:
+    """
+    Loads scored records from one or more journals. The latest record for a
+    profile wins. With job_name, records scored for other jobs are skipped.
+    """
+    by_url = {}
+    for path in journal_paths:
+        for record in read_journal(path):
+            if job_name and record.get("Job") not in (None, job_name):
+                continue
+            by_url[record.get("LinkedIn")] = record
+    return list(by_url.values())
+
+def calculate_lead_scores(records: list, weights: dict = LEAD_SCORE_WEIGHTS) -> np.ndarray:
+    """Recomputes the lead score of every record in one vectorized pass, using the given weights."""
+    sub_scores = np.array(
+        [[float(record.get(field) or 0) for field in SUB_SCORE_FIELDS] for record in records],
+        dtype=np.float64,
+    ).reshape(len(records), len(SUB_SCORE_FIELDS))
+    weight_vector = np.array([weights[key] for key in WEIGHT_KEYS], dtype=np.float64)
+    return np.round(sub_scores @ weight_vector, 2)
+
+def matches_required_keywords(record: dict, required_keywords: list = REQUIRED_KEYWORDS) -> bool:
+    """Re-applies the required keywords filter to the candidate's current role."""
+    role = (record.get("Current Role") or "").lower()
+    return all(keyword.lower() in role for keyword in required_keywords)
+
+def rerank_job(job: dict, output_file: str, journal_paths: list = None):
+    """Recomputes lead scores for one job's past candidates and writes them to output_file, best first."""
+    started = time.perf_counter()
+    if journal_paths:
+        records = load_from_journals(journal_paths, job["name"])
+        source = ", ".join(journal_paths)
+    else:
+        records = load_from_store(job["description"])
+        source = f"{PROFILE_STORE_FILE} and the LLM cache"
+    print(f"Loaded {len(records)} scored candidates from {source}.")
+
+    records = [record for record in records if matches_required_keywords(record, job["required_keywords"])]
+    if not records:
+        print("No candidates left to rerank.")
+        return
+
+    lead_scores = calculate_lead_scores(records, job["weights"])
+    order = np.argsort(-lead_scores, kind="stable")
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for i in order:
+            writer.writerow({**records[i], "Lead Score": float(lead_scores[i])})
+
+    print(f"Reranked {len(records)} candidates into {output_file} in {time.perf_counter() - started:.2f}s.")
+
+def run_rerank(output_file: str = None, journal_paths: list = None):
+    """
+    Recomputes lead scores for past candidates of every configured job with the
+    current config and writes them out, best first. No browser or LLM calls are made.
+    """
+    jobs = configured_jobs()
+    if output_file and len(jobs) > 1:
+        print(f"Several jobs are configured, so each one is written to its own file instead of {output_file}.")
+    for job in jobs:
+        if len(jobs) > 1:
+            print(f"\n=== {job['name']} ===")
+        rerank_job(job, output_file if output_file and len(jobs) == 1 else job["rerank_file"], journal_paths)
@@ -0,0 +1,87 @@
+import queue
+import threading
+
+# Pushed onto the queue once per worker to tell it there is no more work.
+_STOP = object()
+
+class ScoringPipeline:
+    """
+    Scores scraped profiles on background threads so the LLM works while the
+    browser keeps scraping.
+
+    Profiles go into a bounded queue. When the queue is full, submit() blocks,
+    which stops the browser from running too far ahead of the model. Results are
+    keyed by the position the profile was submitted with, so close() returns them
+    in the same order the candidates were found.
+    """
+
+    def __init__(self, score_fn, num_workers: int = 1, max_queued: int = 3, batch_size: int = 1):
+        """
+        Args:
+            score_fn (callable): Takes a list of scraped profile dicts (one, unless
+                                 batch_size > 1) and returns one result per profile,
+                                 or None for a candidate that should be dropped.
+            num_workers (int): Number of scoring threads.
+            max_queued (int): How many profiles can wait in the queue before submit() blocks.
+                              Raised to batch_size so a full batch can build up.
+            batch_size (int): Most profiles a worker takes off the queue at once.
+        """
+        self.score_fn = score_fn
+        self.batch_size = max(1, batch_size)
+        self._queue = queue.Queue(maxsize=max(1, max_queued, self.batch_size))
+        self._results = {}
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"scorer-{i}", daemon=True)
+            for i in range(max(1, num_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _worker(self):
+        while True:
+            items = [self._queue.get()]
+            # Whatever is already waiting joins the batch; a worker never waits for a batch to fill up
+            while len(items) < self.batch_size and items[-1] is not _STOP:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                batch = [item for item in items if item is not _STOP]
+                if batch:
+                    self._score(batch)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            if items[-1] is _STOP:
+                return
+
+    def _score(self, batch: list):
+        profiles = [profile for _, profile in batch]
+        try:
+            results = self.score_fn(profiles)
+        except Exception as e:
+            names = ", ".join(profile.get('LinkedIn', 'candidate') for profile in profiles)
+            print(f"An error occurred while scoring {names}. Skipping.")
+            print(f"Error: {e}")
+            results = [None] * len(batch)
+        with self._lock:
+            for (index, _), result in zip(batch, results):
+                self._results[index] = result
+
+    def submit(self, index: int, profile: dict):
+        """Queues a profile for scoring. Blocks while the queue is full."""
+        self._queue.put((index, profile))
+
+    def pending(self) -> int:
+        """Returns the number of profiles waiting for a free worker."""
+        return self._queue.qsize()
+
+    def close(self) -> list:
+        """Waits for all queued profiles to be scored and returns the results in submission order."""
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        return [self._results[i] for i in sorted(self._results) if self._results[i] is not None]
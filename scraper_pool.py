@@ -0,0 +1,84 @@
+import queue
+import threading
+
+# Pushed onto the task queue once per worker to tell it there are no more candidates.
+_STOP = object()
+
+class ScraperPool:
+    """
+    Processes candidates on several browser pages at once.
+
+    Playwright's sync API is not thread-safe, so each worker thread starts its
+    own Playwright instance and opens its own page through open_page. Pacing is
+    left to the shared NavigationScheduler, so adding workers adds parallelism
+    without raising the overall request rate.
+    """
+
+    def __init__(self, num_workers: int, open_page, process_fn):
+        """
+        Args:
+            num_workers (int): Number of worker threads, each with its own browser page.
+            open_page (callable): Takes a Playwright instance and returns a ready, logged-in page.
+            process_fn (callable): Called as process_fn(page, index, candidate) for each candidate.
+        """
+        self.num_workers = max(1, num_workers)
+        self.open_page = open_page
+        self.process_fn = process_fn
+
+    def _worker(self, tasks: queue.Queue):
+        # Imported here so the module can be loaded without Playwright installed
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            try:
+                page = self.open_page(p)
+            except Exception as e:
+                print(f"[{threading.current_thread().name}] Could not open a browser page: {e}")
+                return
+            while True:
+                task = tasks.get()
+                if task is _STOP:
+                    return
+                index, candidate = task
+                self.process_fn(page, index, candidate)
+
+    def run(self, candidates):
+        """
+        Processes every candidate and returns once all workers are done.
+
+        candidates can be a list or any iterable, such as a generator that
+        yields candidates as search pages are read. It is consumed on the
+        calling thread, and only as fast as the workers take candidates, so a
+        generator is never read far ahead of the scraping.
+        """
+        num_workers = min(self.num_workers, len(candidates)) if isinstance(candidates, list) else self.num_workers
+        tasks = queue.Queue(maxsize=max(1, num_workers))
+        workers = [
+            threading.Thread(target=self._worker, args=(tasks,), name=f"scraper-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        def put(task) -> bool:
+            # Gives up if every worker has stopped, e.g. because none could open a browser page
+            while True:
+                try:
+                    tasks.put(task, timeout=1)
+                    return True
+                except queue.Full:
+                    if not any(worker.is_alive() for worker in workers):
+                        return False
+
+        unprocessed = 0
+        for index, candidate in enumerate(candidates):
+            if not put((index, candidate)):
+                unprocessed += 1
+        for _ in workers:
+            put(_STOP)
+        for worker in workers:
+            worker.join()
+
+        unprocessed += sum(1 for task in list(tasks.queue) if task is not _STOP)
+        if unprocessed:
+            print(f"Warning: {unprocessed} candidate(s) were not processed because no browser page could be opened.")
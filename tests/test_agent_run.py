@@ -0,0 +1,128 @@
+import pytest
+
+import recruiter_agent
+from candidate_journal import read_journal
+from goal_tracker import GoalTracker
+from recruiter_agent import AgentRun
+
+class FakeContext:
+    """A browser context whose pages are never used, for runs that search and scrape through fakes."""
+
+    def new_page(self):
+        return FakePage()
+
+class FakePage:
+    def on(self, event, handler):
+        pass
+
+def make_job(tmp_path, name: str) -> dict:
+    return {
+        "name": name, "title": name, "description": f"{name} with C++", "weights": {}, "required_keywords": [],
+        "output_file": str(tmp_path / f"{name}.csv"), "journal_file": str(tmp_path / f"{name}.jsonl"),
+    }
+
+def make_candidates(count: int, jobs=(0,)) -> list:
+    return [{"url": f"https://www.linkedin.com/in/candidate-{i}", "headline": "engineer", "jobs": list(jobs)}
+            for i in range(count)]
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Runs AgentRun without a browser, Ollama or Sheets. Scores come from lead_scores (by URL, default 8)."""
+    settings = {
+        "PIPELINED_SCORING": False, "SCORING_WORKERS": 2, "SCORING_QUEUE_SIZE": 3, "SCORING_BATCH_SIZE": 1,
+        "INCREMENTAL_SCRAPE": False, "PRERANK_CANDIDATES": False, "TIERED_SCRAPING": False,
+        "GOOGLE_SHEET_ID": None, "SCRAPER_WORKERS": 1,
+    }
+    for name, value in settings.items():
+        monkeypatch.setattr(recruiter_agent, name, value)
+
+    state = {"scraped": [], "lead_scores": {}}
+
+    def get_candidate_profile(page, profile_store, candidate, needs_skills=None):
+        state["scraped"].append(candidate["url"])
+        return {"LinkedIn": candidate["url"], "Name": candidate["url"].rsplit("/", 1)[1]}, True
+
+    def score_candidate(scraped_data, job):
+        return {**scraped_data, "Lead Score": state["lead_scores"].get(scraped_data["LinkedIn"], 8)}
+
+    def score_candidates(scraped_profiles, job):
+        return [score_candidate(profile, job) for profile in scraped_profiles]
+
+    monkeypatch.setattr(recruiter_agent, "get_candidate_profile", get_candidate_profile)
+    monkeypatch.setattr(recruiter_agent, "score_candidate", score_candidate)
+    monkeypatch.setattr(recruiter_agent, "score_candidates", score_candidates)
+    return state
+
+def test_inline_run_scores_every_candidate_in_order(tmp_path, agent):
+    jobs = [make_job(tmp_path, "Developer")]
+    run = AgentRun(jobs, make_candidates(3))
+    run.scrape(FakePage(), FakeContext())
+    records = run.finish()
+    assert [record["Name"] for record in records] == ["candidate-0", "candidate-1", "candidate-2"]
+    assert len(read_journal(jobs[0]["journal_file"])) == 3
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_pipelined_run_scores_every_candidate(tmp_path, agent, monkeypatch, batch_size):
+    monkeypatch.setattr(recruiter_agent, "PIPELINED_SCORING", True)
+    monkeypatch.setattr(recruiter_agent, "SCORING_BATCH_SIZE", batch_size)
+    jobs = [make_job(tmp_path, "Developer")]
+    run = AgentRun(jobs, make_candidates(5))
+    run.scrape(FakePage(), FakeContext())
+    assert len(run.finish()) == 5
+
+def test_a_profile_found_by_two_jobs_is_scraped_once_and_scored_for_both(tmp_path, agent):
+    jobs = [make_job(tmp_path, "Developer"), make_job(tmp_path, "Architect")]
+    run = AgentRun(jobs, make_candidates(2, jobs=(0, 1)))
+    run.scrape(FakePage(), FakeContext())
+    records = run.finish()
+    assert len(agent["scraped"]) == 2
+    assert [record["Job"] for record in records] == ["Developer", "Architect", "Developer", "Architect"]
+
+def test_resume_skips_candidates_already_in_the_journal(tmp_path, agent):
+    jobs = [make_job(tmp_path, "Developer")]
+    first = AgentRun(jobs, make_candidates(2))
+    first.scrape(FakePage(), FakeContext())
+    first.finish()
+
+    agent["scraped"].clear()
+    run = AgentRun(jobs, make_candidates(4), resume=True)
+    assert [candidate["url"] for candidate in run.candidates] == [c["url"] for c in make_candidates(4)[2:]]
+    run.scrape(FakePage(), FakeContext())
+    run.finish()
+    assert len(agent["scraped"]) == 2
+    assert len(read_journal(jobs[0]["journal_file"])) == 4
+
+def test_goal_mode_stops_searching_and_scraping_once_the_goal_is_met(tmp_path, agent, monkeypatch):
+    pages_read = []
+    def iter_search_pages(page, job_title, max_candidates, required_keywords=None, prefetch=True):
+        assert not prefetch
+        for start in range(0, 30, 5):
+            pages_read.append(start)
+            yield [{"url": f"https://www.linkedin.com/in/candidate-{start + k}", "headline": "engineer"} for k in range(5)]
+    monkeypatch.setattr(recruiter_agent, "iter_search_pages", iter_search_pages)
+    # Only every other candidate is good enough
+    agent["lead_scores"] = {f"https://www.linkedin.com/in/candidate-{i}": 8 if i % 2 else 2 for i in range(30)}
+
+    jobs = [make_job(tmp_path, "Developer")]
+    goal = GoalTracker(["Developer"], target=3, min_lead_score=7)
+    run = AgentRun(jobs, [], goal=goal)
+    run.scrape(FakePage(), FakeContext())
+    run.finish()
+
+    assert goal.job_met("Developer")
+    # candidate-5 is the third good one, so the second page is the last one read and nothing after it is scraped
+    assert pages_read == [0, 5]
+    assert agent["scraped"][-1] == "https://www.linkedin.com/in/candidate-5"
+
+def test_goal_mode_resume_counts_earlier_records_towards_the_goal(tmp_path, agent, monkeypatch):
+    monkeypatch.setattr(recruiter_agent, "iter_search_pages", lambda *args, **kwargs: pytest.fail("should not search"))
+    jobs = [make_job(tmp_path, "Developer")]
+    first = AgentRun(jobs, make_candidates(2))
+    first.scrape(FakePage(), FakeContext())
+    first.finish()
+
+    goal = GoalTracker(["Developer"], target=2, min_lead_score=7)
+    run = AgentRun(jobs, [], resume=True, goal=goal)
+    assert goal.job_met("Developer")
+    run.scrape(FakePage(), FakeContext())
+    assert run.finish() == []
@@ -0,0 +1,140 @@
+import gspread
+import pytest
+
+import google_sheets_handler
+from google_sheets_handler import SheetWriter
+
+class FakeSheetResponse:
+    """Just enough of a requests.Response for gspread's APIError."""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.text = f"HTTP {status_code}"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": "FAKE"}}
+
+class FakeWorksheet:
+    """
+    An in-memory worksheet. `failures` maps a method name to the HTTP statuses
+    its next calls fail with, one per call, so retries can be exercised.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.calls = {"row_values": 0, "update": 0, "append_rows": 0}
+        self.failures = {}
+
+    def _call(self, name: str):
+        self.calls[name] += 1
+        pending = self.failures.get(name)
+        if pending:
+            raise gspread.exceptions.APIError(FakeSheetResponse(pending.pop(0)))
+
+    def row_values(self, row: int) -> list:
+        self._call("row_values")
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def update(self, values: list, cell: str):
+        self._call("update")
+        self.rows[:len(values)] = values
+
+    def append_rows(self, rows: list):
+        self._call("append_rows")
+        self.rows.extend(rows)
+
+class FakeSheetClient:
+    """An in-memory gspread client whose spreadsheet holds one FakeWorksheet."""
+
+    def __init__(self, worksheet: FakeWorksheet):
+        self.worksheet_ = worksheet
+
+    def open_by_key(self, key: str):
+        return self
+
+    def worksheet(self, name: str) -> FakeWorksheet:
+        return self.worksheet_
+
+ROWS = [{"Name": f"Candidate {i}", "Lead Score": i, "Notes": None} for i in range(7)]
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(google_sheets_handler.time, "sleep", sleeps.append)
+    return sleeps
+
+def make_writer(worksheet, batch_size=3, max_retries=2, backoff_seconds=0):
+    return SheetWriter("sheet", "Candidates", batch_size=batch_size, flush_interval=3600,
+                       max_retries=max_retries, backoff_seconds=backoff_seconds, client=FakeSheetClient(worksheet))
+
+def names(worksheet):
+    return [row[0] for row in worksheet.rows]
+
+def test_rows_are_appended_in_batches_under_one_header():
+    worksheet = FakeWorksheet()
+    writer = make_writer(worksheet)
+    for row in ROWS:
+        writer.add(row)
+    assert worksheet.calls["append_rows"] == 2
+    writer.close()
+    assert worksheet.calls == {"row_values": 1, "update": 1, "append_rows": 3}
+    assert worksheet.rows[0] == ["Name", "Lead Score", "Notes"]
+    assert worksheet.rows[1:] == [[row["Name"], row["Lead Score"], ""] for row in ROWS]
+    assert writer.rows_written == 7
+
+def test_flush_retries_quota_errors_with_backoff(no_sleep):
+    worksheet = FakeWorksheet()
+    worksheet.failures["append_rows"] = [429, 503]
+    writer = make_writer(worksheet, batch_size=10, backoff_seconds=1)
+    for row in ROWS[:3]:
+        writer.add(row)
+    writer.flush()
+    assert worksheet.calls["append_rows"] == 3
+    assert names(worksheet) == ["Name", "Candidate 0", "Candidate 1", "Candidate 2"]
+    assert len(no_sleep) == 2 and no_sleep[1] >= 2 * 1
+
+def test_flush_gives_up_after_max_retries_and_keeps_the_rows():
+    worksheet = FakeWorksheet()
+    worksheet.failures["append_rows"] = [429, 429, 429]
+    writer = make_writer(worksheet, batch_size=10)
+    writer.add(ROWS[0])
+    with pytest.raises(gspread.exceptions.APIError):
+        writer.flush()
+    assert worksheet.calls["append_rows"] == 3
+    writer.close()
+    assert names(worksheet) == ["Name", "Candidate 0"]
+
+def test_non_retryable_errors_are_not_retried():
+    worksheet = FakeWorksheet()
+    worksheet.failures["row_values"] = [403]
+    writer = make_writer(worksheet, batch_size=10)
+    writer.add(ROWS[0])
+    with pytest.raises(gspread.exceptions.APIError):
+        writer.flush()
+    assert worksheet.calls["row_values"] == 1
+
+def test_row_added_while_the_header_cannot_be_read_is_kept():
+    worksheet = FakeWorksheet()
+    worksheet.failures["row_values"] = [503]
+    writer = make_writer(worksheet, batch_size=1)
+    with pytest.raises(gspread.exceptions.APIError):
+        writer.add(ROWS[0])
+    assert not worksheet.rows
+    writer.close()
+    assert names(worksheet) == ["Name", "Candidate 0"]
+
+def test_add_never_sleeps_and_waits_for_a_cooldown_after_a_failure(no_sleep):
+    worksheet = FakeWorksheet()
+    worksheet.failures["append_rows"] = [429]
+    writer = make_writer(worksheet, batch_size=1, backoff_seconds=60)
+    with pytest.raises(gspread.exceptions.APIError):
+        writer.add(ROWS[0])
+    # Within the cooldown, add() only buffers
+    writer.add(ROWS[1])
+    writer.add(ROWS[2])
+    assert worksheet.calls["append_rows"] == 1
+    assert not no_sleep
+    # After the cooldown the next add() appends everything, in order
+    writer._retry_after = 0.0
+    writer.add(ROWS[3])
+    assert names(worksheet) == ["Name", "Candidate 0", "Candidate 1", "Candidate 2", "Candidate 3"]
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+import benchmark
+from ollama_pool import EndpointPool, OllamaEndpoint
+
+MODEL = "llama3.2"
+
+def stub_server(failing=False, latency=0.01, slots=8):
+    """Starts a stub Ollama server that counts its health checks."""
+    class Handler(benchmark.OllamaStubHandler):
+        tags_requests = 0
+
+        def do_GET(self):
+            with self.counter_lock:
+                type(self).tags_requests += 1
+            super().do_GET()
+
+    Handler.failing = failing
+    Handler.latency = latency
+    Handler.slots = threading.Semaphore(slots)
+    Handler.chat_requests = 0
+    server = benchmark.start_server(Handler)
+    return server, Handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+@pytest.fixture
+def servers():
+    started = []
+    def start(**kwargs):
+        server, handler, host = stub_server(**kwargs)
+        started.append(server)
+        return handler, host
+    yield start
+    for server in started:
+        server.shutdown()
+
+class LeaseCounter:
+    """Counts the leases held on each endpoint at once, and the most seen."""
+
+    def __init__(self):
+        self.held = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def enter(self, endpoint):
+        with self._lock:
+            self.held[endpoint] = self.held.get(endpoint, 0) + 1
+            self.peak[endpoint] = max(self.peak.get(endpoint, 0), self.held[endpoint])
+
+    def exit(self, endpoint):
+        with self._lock:
+            self.held[endpoint] -= 1
+
+def chat(pool: EndpointPool, counter: LeaseCounter = None):
+    """One chat request through the pool. Returns the endpoint that answered, or None if it failed."""
+    try:
+        with pool.lease() as endpoint:
+            if endpoint is None:
+                return None
+            if counter:
+                counter.enter(endpoint)
+            try:
+                endpoint.client.chat(model=MODEL, messages=[{"role": "user", "content": "Score this candidate."}], stream=False)
+            finally:
+                if counter:
+                    counter.exit(endpoint)
+            return endpoint
+    except Exception:
+        return None
+
+def test_failing_server_is_ejected_and_probed_again(servers):
+    healthy_handler, healthy_host = servers()
+    failing_handler, failing_host = servers(failing=True)
+    healthy, failing = OllamaEndpoint(healthy_host, MODEL), OllamaEndpoint(failing_host, MODEL)
+    pool = EndpointPool([healthy, failing], eject_seconds=0.2, max_eject_seconds=0.4)
+
+    answered = []
+    deadline = time.monotonic() + 1.5
+    while time.monotonic() < deadline:
+        answered.append(chat(pool))
+        time.sleep(0.02)
+
+    # Every request the failing server got ejected it, and it was let back in after a passing health check
+    assert failing.ejections >= 2
+    assert failing_handler.chat_requests == failing.failures == failing.ejections
+    assert failing_handler.tags_requests >= failing.ejections
+    # Everything else went to the healthy server, which never failed
+    assert healthy.failures == 0 and healthy.ejections == 0
+    assert answered.count(healthy) == healthy_handler.chat_requests == len(answered) - failing.failures
+
+def test_requests_go_to_the_least_busy_server_within_its_limit(servers):
+    handlers_and_hosts = [servers(latency=0.3), servers(latency=0.3)]
+    endpoints = [OllamaEndpoint(host, MODEL, max_concurrent=2) for _, host in handlers_and_hosts]
+    pool = EndpointPool(endpoints)
+
+    answered = []
+    counter = LeaseCounter()
+    threads = [threading.Thread(target=lambda: answered.append(chat(pool, counter))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(answered) == 8 and None not in answered
+    for endpoint, (handler, _) in zip(endpoints, handlers_and_hosts):
+        # Never more than max_concurrent at once, and both servers were kept full
+        assert counter.peak[endpoint] == 2
+        assert endpoint.requests == handler.chat_requests == 4
+        assert endpoint.outstanding == 0
+
+def test_lease_yields_none_when_every_server_is_down():
+    pool = EndpointPool([OllamaEndpoint("http://127.0.0.1:9", MODEL)], eject_seconds=60)
+    with pool.lease() as endpoint:
+        assert endpoint is None
+    assert pool.endpoints[0].ejections == 1
+
+def test_lease_prefers_the_given_server_when_it_is_free(servers):
+    endpoints = [OllamaEndpoint(host, MODEL) for _, host in (servers(), servers())]
+    pool = EndpointPool(endpoints)
+    for _ in range(3):
+        with pool.lease(prefer=endpoints[1]) as endpoint:
+            assert endpoint is endpoints[1]
@@ -0,0 +1,68 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import benchmark
+from recruiter_agent import next_search_page_url, parse_search_payload
+
+BASE_URL = "http://127.0.0.1:8000"
+# The search API URL the fixture search page requests, as in bench_fixtures/search.html
+SEARCH_URL = (f"{BASE_URL}/voyager/api/graphql?variables=(start:{{start}},origin:GLOBAL_SEARCH_HEADER,"
+              "query:(keywords:engineer,flagshipSearchIntent:SEARCH_SRP))&queryId=voyagerSearchDashClusters.b0928897")
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    """The parts of the benchmark's fixture server that render search API payloads, with 23 candidates."""
+    return SimpleNamespace(
+        candidates=benchmark.build_candidates(23),
+        base_url=BASE_URL,
+        templates={
+            "search_payload": benchmark.load_template("search_payload.json"),
+            "search_entity": benchmark.load_template("search_entity.json"),
+        },
+    )
+
+def payload_at(server, start: int) -> dict:
+    return json.loads(benchmark.LinkedInFixtureHandler._search_payload(server, start))
+
+def test_parses_the_people_results_of_a_page(fixture_server):
+    results = parse_search_payload(payload_at(fixture_server, 0))
+    expected = fixture_server.candidates[:benchmark.RESULTS_PER_PAGE]
+    assert [result["href"].split("?")[0] for result in results] == [f"{BASE_URL}/in/{c['slug']}" for c in expected]
+    assert [result["headline"] for result in results] == [c["headline"] for c in expected]
+    # The same URN as the result card's data-chameleon-result-urn
+    assert [result["urn"] for result in results] == [f"urn:li:member:{c['member_id']}" for c in expected]
+
+def test_insight_links_are_not_results(fixture_server):
+    results = parse_search_payload(payload_at(fixture_server, 0))
+    assert all("/search/results/" not in result["href"] for result in results)
+
+def test_pages_through_to_the_last_page(fixture_server):
+    url = SEARCH_URL.format(start=0)
+    starts, found = [], 0
+    while url:
+        start = int(url.split("(start:")[1].split(",")[0])
+        payload = payload_at(fixture_server, start)
+        results = parse_search_payload(payload)
+        starts.append(start)
+        found += len(results)
+        url = next_search_page_url(url, payload, len(results))
+    assert starts == [0, 10, 20]
+    assert found == 23
+
+def test_next_page_offset_is_read_from_the_collection_paging(fixture_server):
+    payload = payload_at(fixture_server, 10)
+    # Paging-like objects elsewhere in the payload must not be mistaken for the results' paging
+    stray = {"start": 3, "count": 1, "total": 100}
+    payload = {"included": [stray, *payload["included"]], "data": payload["data"]}
+    payload["data"]["data"]["searchDashClustersByAll"]["metadata"].update(stray)
+    assert next_search_page_url(SEARCH_URL.format(start=10), payload, 10) == SEARCH_URL.format(start=20)
+
+def test_last_page_has_no_next_page(fixture_server):
+    payload = payload_at(fixture_server, 20)
+    assert len(parse_search_payload(payload)) == 3
+    assert next_search_page_url(SEARCH_URL.format(start=20), payload, 3) is None
+
+def test_url_without_an_offset_has_no_next_page(fixture_server):
+    assert next_search_page_url(f"{BASE_URL}/voyager/api/graphql?queryId=x", payload_at(fixture_server, 0), 10) is None
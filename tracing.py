@@ -0,0 +1,150 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Ollama response fields copied onto LLM spans. Durations are in nanoseconds.
+OLLAMA_STAT_FIELDS = (
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+    "load_duration",
+    "total_duration",
+)
+
+class Tracer:
+    """
+    Records timed spans from any thread, writes each one to a JSONL trace and
+    keeps per-span totals for the end-of-run summary.
+
+    Span times are inclusive: a profile_scrape span also contains the
+    skills_scrape and pacing_wait spans that happen inside it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file = None
+        self._durations = {}
+        self._llm_totals = {field: 0 for field in OLLAMA_STAT_FIELDS}
+        self._llm_calls_with_stats = 0
+        self._prompts = {"calls": 0, "estimated_tokens": 0, "evaluated_tokens": 0, "prefixes": set()}
+        self._started = time.time()
+
+    def start(self, path: str = None):
+        """Resets the counters and starts writing spans to path (if given)."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._file = open(path, 'w', encoding='utf-8', buffering=1) if path else None
+            self._durations = {}
+            self._llm_totals = {field: 0 for field in OLLAMA_STAT_FIELDS}
+            self._llm_calls_with_stats = 0
+            self._prompts = {"calls": 0, "estimated_tokens": 0, "evaluated_tokens": 0, "prefixes": set()}
+            self._started = time.time()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Times the enclosed block. The yielded dict can be filled with extra
+        attributes (e.g. token counts) before the block ends.
+        """
+        started = time.time()
+        perf_started = time.perf_counter()
+        error = None
+        try:
+            yield attributes
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._record(name, started, time.perf_counter() - perf_started, attributes, error)
+
+    def record_prompt(self, attributes: dict, prefix_hash: str, estimated_tokens: int):
+        """
+        Notes which system prefix an LLM call used and roughly how many prompt
+        tokens it sent. Record this before record_llm_stats on the same span.
+        """
+        attributes["prefix_hash"] = prefix_hash
+        attributes["estimated_prompt_tokens"] = estimated_tokens
+        with self._lock:
+            self._prompts["calls"] += 1
+            self._prompts["prefixes"].add(prefix_hash)
+
+    def record_llm_stats(self, attributes: dict, response):
+        """Copies Ollama's token counts and durations from a chat response onto a span."""
+        stats = {field: response.get(field) for field in OLLAMA_STAT_FIELDS}
+        stats = {field: value for field, value in stats.items() if value is not None}
+        if not stats:
+            return
+        attributes.update(stats)
+        with self._lock:
+            self._llm_calls_with_stats += 1
+            for field, value in stats.items():
+                self._llm_totals[field] += value
+            # Ollama only counts the prompt tokens it had to evaluate; a reused prefix is not counted.
+            # Calls whose stream was closed before the final chunk have no counts and are left out.
+            if "estimated_prompt_tokens" in attributes and "prompt_eval_count" in stats:
+                self._prompts["estimated_tokens"] += attributes["estimated_prompt_tokens"]
+                self._prompts["evaluated_tokens"] += stats["prompt_eval_count"]
+
+    def _record(self, name, started, duration, attributes, error):
+        entry = {
+            "span": name,
+            "start": round(started, 6),
+            "duration": round(duration, 6),
+            "thread": threading.current_thread().name,
+            **attributes,
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._durations.setdefault(name, []).append(duration)
+            if self._file:
+                self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def print_summary(self):
+        """Prints where the wall clock went, per span, and the LLM token throughput."""
+        with self._lock:
+            durations = {name: list(values) for name, values in self._durations.items()}
+            llm = dict(self._llm_totals)
+            llm_calls = self._llm_calls_with_stats
+            prompts = dict(self._prompts, prefixes=len(self._prompts["prefixes"]))
+        wall = time.time() - self._started
+        if not durations:
+            return
+
+        print(f"\n--- Run Timing Summary (wall clock {wall:.1f}s, span times are inclusive) ---")
+        print(f"{'Span':<18}{'count':>7}{'total (s)':>11}{'mean (s)':>10}{'p95 (s)':>10}{'% wall':>8}")
+        for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            ordered = sorted(values)
+            p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+            total = sum(values)
+            print(f"{name:<18}{len(values):>7}{total:>11.1f}{total / len(values):>10.2f}{p95:>10.2f}"
+                  f"{100 * total / wall if wall else 0:>7.0f}%")
+
+        if llm_calls:
+            prompt_seconds = llm["prompt_eval_duration"] / 1e9
+            eval_seconds = llm["eval_duration"] / 1e9
+            print(f"LLM: {llm_calls} call(s), {llm['prompt_eval_count']} prompt tokens"
+                  f" ({llm['prompt_eval_count'] / prompt_seconds if prompt_seconds else 0:.0f} tok/s),"
+                  f" {llm['eval_count']} generated tokens"
+                  f" ({llm['eval_count'] / eval_seconds if eval_seconds else 0:.1f} tok/s),"
+                  f" {llm['load_duration'] / 1e9:.1f}s spent loading the model.")
+        if prompts["calls"] and prompts["estimated_tokens"]:
+            # Token estimates are rough (about 4 characters per token), so the share is only indicative
+            reused = max(0.0, 1 - prompts["evaluated_tokens"] / prompts["estimated_tokens"])
+            print(f"Prompt prefix reuse: {prompts['calls']} scoring call(s) with {prompts['prefixes']} distinct system"
+                  f" prefix(es); Ollama evaluated {prompts['evaluated_tokens']} of ~{prompts['estimated_tokens']}"
+                  f" prompt tokens sent (~{100 * reused:.0f}% served from its prefix cache).")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+# One tracer for the whole process, shared by every module.
+tracer = Tracer()
+span = tracer.span